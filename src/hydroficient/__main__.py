@@ -0,0 +1,3 @@
+from hydroficient.cli import main
+
+raise SystemExit(main())
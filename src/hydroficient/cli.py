@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Subcommand -> (module, function, summary). Modules are imported only when their command runs.
+COMMANDS: Dict[str, Tuple[str, str, str]] = {
+    "ingest": ("hydroficient.pipeline.ingest_service", "main", "run the MQTT ingest service"),
+    "simulate": ("hydroficient.simulator.device_simulator", "main", "publish simulated telemetry or replay traces"),
+    "seed": ("hydroficient.simulator.seed_mock_data", "main", "fill the database with mock data"),
+    "devices": ("hydroficient.pipeline.devices", "main", "manage the device registry"),
+    "counters": ("hydroficient.pipeline.counters", "main", "check or repair the KPI counters"),
+    "export": ("hydroficient.pipeline.export", "main", "stream telemetry or security events to CSV/JSONL"),
+    "dashboard": ("hydroficient.cli", "run_dashboard", "launch the Streamlit dashboard"),
+    "replay-attack": ("hydroficient.security.replay_attack", "main", "publish a replayed payload"),
+    "attack-harness": ("hydroficient.security.attack_harness", "main", "sustained replay/fuzz flood"),
+    "reconnect-storm": ("hydroficient.simulator.reconnect_storm", "main", "drop and re-establish many connections"),
+    "tls-benchmark": ("hydroficient.security.tls_benchmark", "main", "measure TLS handshakes"),
+    "tls-server": ("hydroficient.security.tls_echo_server", "main", "run the local mTLS echo server"),
+    "hmac-benchmark": ("hydroficient.security.hmac_benchmark", "main", "measure payload signature verification"),
+    "query-benchmark": ("hydroficient.pipeline.query_benchmark", "main", "measure dashboard queries as the table grows"),
+    "startup": ("hydroficient.startup", "main", "measure CLI import time against a budget"),
+}
+
+
+def _usage() -> str:
+    width = max(len(name) for name in COMMANDS)
+    lines = ["usage: hydroficient <command> [options]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {summary}" for name, (_, _, summary) in COMMANDS.items()]
+    lines += ["", "Run 'hydroficient <command> --help' for command options."]
+    return "\n".join(lines)
+
+
+def run_dashboard() -> int:
+    import subprocess
+    from importlib.util import find_spec
+
+    app = find_spec("hydroficient.dashboard.app").origin
+    src_dir = str(Path(app).resolve().parents[2])
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_dir, env.get("PYTHONPATH")]))
+    return subprocess.call([sys.executable, "-m", "streamlit", "run", app, *sys.argv[1:]], env=env)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(_usage())
+        return 0
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"hydroficient: unknown command '{command}'\n\n{_usage()}", file=sys.stderr)
+        return 2
+    module_name, func_name, _ = COMMANDS[command]
+    func = getattr(importlib.import_module(module_name), func_name)
+    sys.argv = [f"hydroficient {command}", *rest]
+    return func() or 0
@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from hydroficient.pipeline.config import DATA_DIR, RECENT
+from hydroficient.pipeline.ringbuffer import RingBufferReader
+from hydroficient.pipeline.storage import (
+    fetch_device_ids,
+    fetch_kpis,
+    fetch_security_windows,
+    fetch_telemetry_downsampled,
+    fetch_tls_metrics,
+    query_device_positions,
+    query_position_cells,
+    query_security_events,
+    query_telemetry,
+)
+
+DB_PATH = DATA_DIR / "pipeline.db"
+
+TIME_RANGES = {
+    "Last hour": timedelta(hours=1),
+    "Last 6 hours": timedelta(hours=6),
+    "Last 24 hours": timedelta(hours=24),
+    "Last 7 days": timedelta(days=7),
+    "Last 30 days": timedelta(days=30),
+    "All history": None,
+}
+TREND_METRICS = ["ph", "turbidity", "temperature"]
+STATUSES = ["All", "ok", "anomaly"]
+EVENT_TYPES = [
+    "replay_detected",
+    "unauthorized_device",
+    "invalid_signature",
+    "stale_message",
+    "invalid_payload",
+    "replay_burst",
+    "device_flapping",
+    "device_silent",
+]
+SEVERITIES = ["low", "medium", "high", "critical"]
+MAP_ROWS = 5000
+TLS_ROWS = 5000
+
+st.set_page_config(page_title="Hydroficient Secure Water Monitor", layout="wide")
+
+st.markdown(
+    """
+    <style>
+    :root {
+        --bg: #0b0f17;
+        --card: #111827;
+        --accent: #00e5ff;
+        --muted: #9aa4b2;
+        --border: #1f2937;
+    }
+    .stApp { background: var(--bg); color: #e5e7eb; }
+    .block-container { padding-top: 2.5rem; }
+    header[data-testid="stHeader"] { background: transparent; }
+    div[data-testid="stToolbar"] { visibility: hidden; height: 0; }
+    .docker-card {
+        background: linear-gradient(180deg, rgba(17,24,39,0.95), rgba(13,18,30,0.95));
+        border: 1px solid var(--border);
+        border-radius: 14px;
+        padding: 16px;
+        box-shadow: 0 0 24px rgba(0,229,255,0.08);
+    }
+    .header-wrap {
+        background: linear-gradient(135deg, rgba(17,24,39,0.95), rgba(11,15,23,0.95));
+        border: 1px solid var(--border);
+        border-radius: 16px;
+        padding: 14px 18px;
+        margin-bottom: 14px;
+        box-shadow: 0 0 28px rgba(0,229,255,0.12);
+    }
+    .header-glow {
+        color: #e5e7eb;
+        text-shadow: 0 0 16px rgba(0,229,255,0.35);
+        font-size: 28px;
+        font-weight: 700;
+        margin: 0;
+    }
+    .metric-title { color: var(--muted); font-size: 12px; text-transform: uppercase; }
+    .metric-value { font-size: 24px; font-weight: 700; color: #e5e7eb; }
+    .status-pill {
+        display: inline-block;
+        padding: 4px 10px;
+        border-radius: 999px;
+        font-size: 12px;
+        border: 1px solid var(--border);
+        background: rgba(0,229,255,0.08);
+        color: #9ff3ff;
+    }
+    </style>
+    """,
+    unsafe_allow_html=True,
+)
+
+
+CSV_FALLBACKS = {
+    "telemetry": DATA_DIR / "mock_telemetry.csv",
+    "security_events": DATA_DIR / "mock_security_events.csv",
+    "tls_metrics": DATA_DIR / "mock_tls_metrics.csv",
+}
+
+
+@st.cache_data
+def _load_csv_fallback(table: str) -> pd.DataFrame:
+    df = pd.read_csv(CSV_FALLBACKS[table])
+    df["ts"] = pd.to_datetime(df["ts"], errors="coerce", utc=True)
+    return df
+
+
+def load_fallback(table: str) -> pd.DataFrame:
+    # Mock CSVs stand in only until the pipeline has created its database; every panel queries SQL after that.
+    if DB_PATH.exists() or not CSV_FALLBACKS[table].exists():
+        return pd.DataFrame()
+    return _load_csv_fallback(table)
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def _window_bounds(window: Optional[timedelta]) -> Tuple[Optional[str], Optional[str]]:
+    if window is None:
+        return None, None
+    now = datetime.now(timezone.utc)
+    return _iso(now - window), _iso(now)
+
+
+@st.cache_data(ttl=60)
+def _device_options() -> List[str]:
+    if not DB_PATH.exists():
+        return []
+    return fetch_device_ids()
+
+
+def load_query(fetch: Callable[..., Iterable[Dict]], **filters) -> pd.DataFrame:
+    if not DB_PATH.exists():
+        return pd.DataFrame()
+    try:
+        df = pd.DataFrame(fetch(**filters))
+    except Exception:
+        return pd.DataFrame()
+    if "ts" in df:
+        df["ts"] = pd.to_datetime(df["ts"], errors="coerce", utc=True)
+    return df
+
+
+@st.cache_resource
+def _recent_reader() -> Optional[RingBufferReader]:
+    return RingBufferReader.attach() if RECENT["enabled"] else None
+
+
+def load_recent(
+    n: int, device_ids: Optional[List[str]], start: Optional[str], status: Optional[str]
+) -> Optional[pd.DataFrame]:
+    # Served from the ingestor's shared-memory buffers; None means it is not running and SQL should be used.
+    if not RECENT["enabled"]:
+        return None
+    reader = _recent_reader()
+    if reader is None or not reader.alive:
+        # Not attached yet (a cached None must not stick), or the ingestor restarted with a fresh segment.
+        if reader is not None:
+            reader.close()
+        _recent_reader.clear()
+        reader = _recent_reader()
+    if reader is None or not reader.covers(device_ids):
+        return None
+    since = datetime.fromisoformat(start.replace("Z", "+00:00")).timestamp() if start else None
+    df = pd.DataFrame(reader.recent(device_ids, reader.capacity if status else n, since=since))
+    if status:
+        df = df[df["status"] == status].tail(n)
+    df["ts"] = pd.to_datetime(df["ts"], unit="s", utc=True)
+    return df
+
+
+st.sidebar.header("Filters")
+selected_devices = st.sidebar.multiselect("Devices", _device_options(), placeholder="All devices")
+time_range = st.sidebar.selectbox("Time range", list(TIME_RANGES), index=2)
+selected_status = st.sidebar.selectbox("Status", STATUSES)
+selected_event_types = st.sidebar.multiselect("Security event types", EVENT_TYPES, placeholder="All types")
+selected_severities = st.sidebar.multiselect("Severity", SEVERITIES, placeholder="All severities")
+point_budget = st.sidebar.slider("Chart point budget", min_value=500, max_value=5000, value=2000, step=500)
+
+range_start, range_end = _window_bounds(TIME_RANGES[time_range])
+telemetry_filters = {
+    "device_ids": selected_devices or None,
+    "start": range_start,
+    "end": range_end,
+    "status": None if selected_status == "All" else selected_status,
+}
+event_filters = {
+    "device_ids": selected_devices or None,
+    "event_types": selected_event_types or None,
+    "severities": selected_severities or None,
+    "start": range_start,
+    "end": range_end,
+}
+
+st.markdown(
+    "<div class='header-wrap'><div class='header-glow'>Hydroficient Secure Water Monitor</div></div>",
+    unsafe_allow_html=True,
+)
+
+col_status, col_time = st.columns([3, 1])
+with col_status:
+    st.markdown("<span class='status-pill'>MQTT TLS ACTIVE • DEVICE CERTS</span>", unsafe_allow_html=True)
+with col_time:
+    st.caption("Real-time pipeline security overview")
+
+metric_cols = st.columns(5)
+
+def load_kpis() -> Dict[str, int]:
+    if DB_PATH.exists():
+        try:
+            kpis = fetch_kpis()
+            if kpis["total_messages"] or kpis["replay_attempts"] or kpis["tls_handshakes"]:
+                return kpis
+        except Exception:
+            pass
+    telemetry = load_fallback("telemetry")
+    security_events = load_fallback("security_events")
+    tls_metrics = load_fallback("tls_metrics")
+    return {
+        "total_messages": len(telemetry),
+        "active_devices": telemetry["device_id"].nunique() if not telemetry.empty else 0,
+        "anomalies": int((telemetry["status"] == "anomaly").sum()) if not telemetry.empty else 0,
+        "replay_attempts": (
+            int((security_events["event_type"] == "replay_detected").sum()) if not security_events.empty else 0
+        ),
+        "tls_handshakes": int(tls_metrics["success"].sum()) if not tls_metrics.empty else 0,
+    }
+
+
+kpis = load_kpis()
+total_msgs = kpis["total_messages"]
+devices = kpis["active_devices"]
+anomalies = kpis["anomalies"]
+replays = kpis["replay_attempts"]
+
+with metric_cols[0]:
+    st.markdown("<div class='docker-card'><div class='metric-title'>Total Messages</div>"
+                f"<div class='metric-value'>{total_msgs}</div></div>", unsafe_allow_html=True)
+with metric_cols[1]:
+    st.markdown("<div class='docker-card'><div class='metric-title'>Active Devices</div>"
+                f"<div class='metric-value'>{devices}</div></div>", unsafe_allow_html=True)
+with metric_cols[2]:
+    st.markdown("<div class='docker-card'><div class='metric-title'>Anomalies</div>"
+                f"<div class='metric-value'>{anomalies}</div></div>", unsafe_allow_html=True)
+with metric_cols[3]:
+    st.markdown("<div class='docker-card'><div class='metric-title'>Replay Attempts</div>"
+                f"<div class='metric-value'>{replays}</div></div>", unsafe_allow_html=True)
+with metric_cols[4]:
+    tls_ok = kpis["tls_handshakes"]
+    st.markdown("<div class='docker-card'><div class='metric-title'>TLS Handshakes</div>"
+                f"<div class='metric-value'>{tls_ok}</div></div>", unsafe_allow_html=True)
+
+st.markdown("<br/>", unsafe_allow_html=True)
+
+left, right = st.columns([2, 1])
+with left:
+    st.markdown("<div class='docker-card'>", unsafe_allow_html=True)
+    st.subheader("Temporal Water Quality Trends")
+    trend = load_query(
+        fetch_telemetry_downsampled,
+        max_points=point_budget,
+        metrics=TREND_METRICS,
+        **telemetry_filters,
+    )
+    if trend.empty and not DB_PATH.exists():
+        trend = load_fallback("telemetry").tail(point_budget // len(TREND_METRICS))
+    if trend.empty and not total_msgs:
+        st.info("No telemetry yet. Run the simulator or seed mock data.")
+    elif trend.empty:
+        st.info("No telemetry matches the selected filters.")
+    else:
+        fig = px.line(
+            trend.sort_values("ts"),
+            x="ts",
+            y=TREND_METRICS,
+            color_discrete_sequence=["#00e5ff", "#8b5cf6", "#22c55e"],
+        )
+        # Downsampled points carry one metric each, at the time that metric peaked.
+        fig.update_traces(connectgaps=True)
+        fig.update_layout(
+            paper_bgcolor="#111827",
+            plot_bgcolor="#0f172a",
+            font_color="#e5e7eb",
+            height=340,
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+with right:
+    st.markdown("<div class='docker-card'>", unsafe_allow_html=True)
+    st.subheader("Pipeline Health")
+    recent = load_recent(30, selected_devices, range_start, telemetry_filters["status"])
+    if recent is None:
+        recent = load_query(query_telemetry, limit=30, **telemetry_filters)
+    if recent.empty and not DB_PATH.exists():
+        recent = load_fallback("telemetry").tail(30)
+    if recent.empty:
+        st.info("Awaiting data stream.")
+    else:
+        health_score = max(0, 100 - int((recent["status"] == "anomaly").mean() * 100))
+        st.metric("Health Score", f"{health_score}%")
+        st.progress(health_score / 100)
+        st.caption("Derived from anomaly rate in latest samples.")
+    st.markdown("</div>", unsafe_allow_html=True)
+
+st.markdown("<br/>", unsafe_allow_html=True)
+
+col_map, col_sec = st.columns([2, 1])
+with col_map:
+    st.markdown("<div class='docker-card'>", unsafe_allow_html=True)
+    st.subheader("Spatial Sensor Coverage")
+    # One point per device from the position index; past MAP_ROWS devices, one point per grid cell.
+    positions = load_query(query_device_positions, limit=MAP_ROWS + 1, **telemetry_filters)
+    merge = 0
+    while len(positions) > MAP_ROWS:
+        merge = merge * 2 or 1
+        positions = load_query(query_position_cells, merge=merge, **telemetry_filters)
+    if merge and not positions.empty:
+        st.caption(f"{int(positions['devices'].sum())} devices aggregated into {len(positions)} grid cells.")
+    if positions.empty and not DB_PATH.exists():
+        positions = load_fallback("telemetry")
+        if not positions.empty:
+            positions = positions.sort_values("ts").groupby("device_id").tail(1)
+    if positions.empty:
+        st.info("No geospatial data available.")
+    else:
+        map_df = positions[["lat", "lon"]].dropna()
+        st.map(map_df.rename(columns={"lat": "latitude", "lon": "longitude"}))
+    st.markdown("</div>", unsafe_allow_html=True)
+
+with col_sec:
+    st.markdown("<div class='docker-card'>", unsafe_allow_html=True)
+    st.subheader("Security Events")
+    recent_events = load_query(query_security_events, limit=10, **event_filters)
+    if recent_events.empty and not DB_PATH.exists():
+        recent_events = load_fallback("security_events")
+        if not recent_events.empty:
+            recent_events = recent_events.sort_values("ts", ascending=False).head(10)
+    if recent_events.empty:
+        st.info("No security events logged.")
+    else:
+        st.dataframe(recent_events, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+st.markdown("<br/>", unsafe_allow_html=True)
+
+st.markdown("<div class='docker-card'>", unsafe_allow_html=True)
+st.subheader("Live Security Windows")
+windows = load_query(fetch_security_windows, limit=20)
+if windows.empty:
+    st.info("No security activity in the current windows.")
+else:
+    st.dataframe(windows, use_container_width=True, hide_index=True)
+    st.caption(f"Sliding-window counters from the ingest correlator, updated {windows['updated'].iloc[0]}.")
+st.markdown("</div>", unsafe_allow_html=True)
+
+st.markdown("<br/>", unsafe_allow_html=True)
+
+st.markdown("<div class='docker-card'>", unsafe_allow_html=True)
+st.subheader("TLS Performance")
+tls_metrics = load_query(fetch_tls_metrics, limit=TLS_ROWS)
+if tls_metrics.empty and not DB_PATH.exists():
+    tls_metrics = load_fallback("tls_metrics")
+if tls_metrics.empty:
+    st.info("No TLS benchmarks recorded.")
+else:
+    fig = px.histogram(
+        tls_metrics,
+        x="handshake_ms",
+        nbins=30,
+        color="success",
+        color_discrete_sequence=["#00e5ff", "#ef4444"],
+    )
+    fig.update_layout(
+        paper_bgcolor="#111827",
+        plot_bgcolor="#0f172a",
+        font_color="#e5e7eb",
+        height=280,
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+BASE_DIR = Path(os.environ.get("HYDRO_HOME", Path(__file__).resolve().parents[3]))
+DATA_DIR = BASE_DIR / "data"
+CERTS_DIR = BASE_DIR / "certs"
+
+MQTT = {
+    "host": "localhost",
+    "port": 8883,
+    "topic": "water/telemetry",
+    "client_id": "pipeline-ingestor",
+    "ca_cert": str(CERTS_DIR / "ca.crt"),
+    "client_cert": str(CERTS_DIR / "pipeline_client.crt"),
+    "client_key": str(CERTS_DIR / "pipeline_client.key"),
+}
+
+# Only for local development: it is public, so anyone can sign payloads with it.
+DEV_HMAC_MASTER_KEY = "hydroficient-dev-master-key"
+
+SECURITY = {
+    "max_skew_seconds": 300,
+    "nonce_cache_size": 10000,
+    "require_signature": True,
+    "hmac_master_key": os.environ.get("HYDRO_HMAC_MASTER_KEY", DEV_HMAC_MASTER_KEY),
+    "hmac_key_cache_size": 4096,
+}
+
+REGISTRY = {
+    "check_interval_seconds": 5.0,
+    "seed_from_certs": True,
+    "default_location": (36.7783, -119.4179),
+    "seed_locations": {
+        "device_001": (36.7783, -119.4179),
+        "device_002": (34.0522, -118.2437),
+        "device_003": (37.7749, -122.4194),
+    },
+}
+
+SPATIAL = {
+    # Grid cells are cell_degrees on a side; about 11km of latitude at 0.1.
+    "cell_degrees": 0.1,
+}
+
+RECENT = {
+    "enabled": os.environ.get("HYDRO_RECENT_SHM", "1") != "0",
+    "shm_name": os.environ.get("HYDRO_RECENT_SHM_NAME", "hydroficient-recent"),
+    "capacity": 128,
+    "max_devices": 1024,
+}
+
+LIVENESS = {
+    "ewma_alpha": 0.2,
+    "silence_factor": 4.0,
+    "min_silence_seconds": 10.0,
+    "default_interval_seconds": 30.0,
+    "poll_interval_seconds": 1.0,
+}
+
+PROFILING = {
+    "dir": DATA_DIR / "profiles",
+    "profile_seconds": float(os.environ.get("HYDRO_PROFILE_SECONDS", "0")),
+    "signal_profile_seconds": 30.0,
+    "trace_sample_rate": float(os.environ.get("HYDRO_TRACE_SAMPLE_RATE", "0")),
+    "signal_trace_sample_rate": 0.01,
+    "top_functions": 40,
+}
+
+RECONNECT = {
+    "base_delay": 0.5,
+    "max_delay": 30.0,
+}
+
+CORRELATION = {
+    "window_seconds": 10,
+    "resolution_seconds": 1,
+    "max_keys": 10000,
+    "flush_interval_seconds": 1.0,
+    "rules": {
+        "replay_burst": {
+            "signal": "replay_detected",
+            "scope": "device",
+            "threshold": 50,
+            "window_seconds": 10,
+            "severity": "critical",
+        },
+        "device_flapping": {
+            "signal": "status_flip",
+            "scope": "device",
+            "threshold": 6,
+            "window_seconds": 60,
+            "severity": "high",
+        },
+        "unauthorized_flood": {
+            "signal": "unauthorized_device",
+            "scope": "fleet",
+            "threshold": 100,
+            "window_seconds": 10,
+            "severity": "high",
+        },
+        "invalid_payload_flood": {
+            "signal": "invalid_payload",
+            "scope": "fleet",
+            "threshold": 100,
+            "window_seconds": 10,
+            "severity": "high",
+        },
+    },
+}
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .config import CORRELATION
+
+FLEET = "*"
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class SlidingWindowCounter:
+    __slots__ = ("resolution", "counts", "stamps")
+
+    def __init__(self, window_seconds: float, resolution_seconds: float) -> None:
+        self.resolution = resolution_seconds
+        buckets = max(1, int(round(window_seconds / resolution_seconds)))
+        self.counts = [0] * buckets
+        self.stamps = [-1] * buckets
+
+    def add(self, now: float, amount: int = 1) -> int:
+        tick = int(now / self.resolution)
+        slot = tick % len(self.counts)
+        if self.stamps[slot] != tick:
+            self.stamps[slot] = tick
+            self.counts[slot] = 0
+        self.counts[slot] += amount
+        return self.total(now)
+
+    def total(self, now: float) -> int:
+        tick = int(now / self.resolution)
+        size = len(self.counts)
+        return sum(count for count, stamp in zip(self.counts, self.stamps) if tick - stamp < size)
+
+
+class SecurityCorrelator:
+    def __init__(self, rules: Optional[Dict[str, Dict]] = None, max_keys: int = CORRELATION["max_keys"]) -> None:
+        self.rules = rules if rules is not None else CORRELATION["rules"]
+        self.max_keys = max_keys
+        self.resolution = CORRELATION["resolution_seconds"]
+        self.default_window = CORRELATION["window_seconds"]
+        self.windows: Dict[str, float] = {}
+        self.rules_by_signal: Dict[str, List[str]] = {}
+        for name, rule in self.rules.items():
+            self.windows[rule["signal"]] = max(self.windows.get(rule["signal"], 0.0), rule["window_seconds"])
+            self.rules_by_signal.setdefault(rule["signal"], []).append(name)
+        self.counters: "OrderedDict[Tuple[str, str], SlidingWindowCounter]" = OrderedDict()
+        self.last_status: "OrderedDict[str, str]" = OrderedDict()
+        self.last_escalation: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def _counter(self, signal: str, scope: str) -> SlidingWindowCounter:
+        key = (signal, scope)
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = SlidingWindowCounter(self.windows.get(signal, self.default_window), self.resolution)
+            self.counters[key] = counter
+            if len(self.counters) > self.max_keys:
+                (evicted_signal, evicted_scope), _ = self.counters.popitem(last=False)
+                # Escalations are keyed by rule, not signal; drop every rule fed by the evicted counter.
+                for name in self.rules_by_signal.get(evicted_signal, ()):
+                    self.last_escalation.pop((name, evicted_scope), None)
+        else:
+            self.counters.move_to_end(key)
+        return counter
+
+    def observe(self, device_id: Optional[str], signal: str, now: Optional[float] = None) -> List[Dict]:
+        now = time.monotonic() if now is None else now
+        device = device_id or "unknown"
+        with self._lock:
+            totals = {
+                "device": self._counter(signal, device).add(now),
+                "fleet": self._counter(signal, FLEET).add(now),
+            }
+            escalations = []
+            for name, rule in self.rules.items():
+                if rule["signal"] != signal or totals[rule["scope"]] < rule["threshold"]:
+                    continue
+                scope = device if rule["scope"] == "device" else FLEET
+                last = self.last_escalation.get((name, scope))
+                if last is not None and now - last < rule["window_seconds"]:
+                    continue
+                self.last_escalation[(name, scope)] = now
+                escalations.append(
+                    {
+                        "ts": _now_iso(),
+                        "event_type": name,
+                        "device_id": device_id if rule["scope"] == "device" else None,
+                        "severity": rule["severity"],
+                        "detail": {
+                            "signal": signal,
+                            "count": totals[rule["scope"]],
+                            "window_seconds": rule["window_seconds"],
+                        },
+                    }
+                )
+            return escalations
+
+    def observe_status(self, device_id: str, status: str, now: Optional[float] = None) -> List[Dict]:
+        with self._lock:
+            previous = self.last_status.get(device_id)
+            self.last_status[device_id] = status
+            self.last_status.move_to_end(device_id)
+            if len(self.last_status) > self.max_keys:
+                self.last_status.popitem(last=False)
+        if previous is None or previous == status:
+            return []
+        return self.observe(device_id, "status_flip", now)
+
+    def snapshot(self, now: Optional[float] = None) -> List[Dict]:
+        now = time.monotonic() if now is None else now
+        tick = int(now / self.resolution)
+        horizon = max([self.default_window, *self.windows.values()]) / self.resolution
+        with self._lock:
+            # Counters are kept in last-touched order, so the walk stops at the first one that has gone quiet
+            # for longer than any window; idle keys cost nothing however many are retained.
+            items = []
+            for key, counter in reversed(self.counters.items()):
+                if tick - max(counter.stamps) >= horizon:
+                    break
+                items.append((key, list(counter.counts), list(counter.stamps)))
+        rows = []
+        for (signal, scope), counts, stamps in items:
+            size = len(counts)
+            count = sum(c for c, stamp in zip(counts, stamps) if tick - stamp < size)
+            if count:
+                rows.append(
+                    {
+                        "signal": signal,
+                        "device_id": scope,
+                        "count": count,
+                        "window_seconds": size * self.resolution,
+                    }
+                )
+        return rows
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import argparse
+import sys
+
+from hydroficient.pipeline.storage import check_counters, fetch_kpis
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check pipeline_counters against the raw tables")
+    parser.add_argument("--repair", action="store_true", help="rebuild the counters when they disagree")
+    args = parser.parse_args()
+
+    mismatches = check_counters(repair=args.repair)
+    for row in mismatches:
+        print(f"[counters] {row['scope']}/{row['key']}/{row['name']}: stored={row['stored']} expected={row['expected']}")
+    if not mismatches:
+        print("[counters] consistent")
+    elif args.repair:
+        print(f"[counters] rebuilt after {len(mismatches)} mismatches")
+    print(f"[counters] {fetch_kpis()}")
+    if mismatches and not args.repair:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from hydroficient.pipeline.config import CERTS_DIR
+from hydroficient.pipeline.registry import DeviceRegistry, cert_fingerprint, ensure_seeded, seed_from_certs
+from hydroficient.pipeline.storage import (
+    delete_devices,
+    fetch_devices,
+    fetch_gaps,
+    fetch_registry_version,
+    set_devices_enabled,
+    upsert_devices,
+)
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def cmd_list(args: argparse.Namespace) -> None:
+    count = 0
+    for device in fetch_devices(enabled_only=args.enabled):
+        count += 1
+        if args.limit and count > args.limit:
+            continue
+        state = "enabled" if device["enabled"] else "disabled"
+        fingerprint = (device["cert_fingerprint"] or "-")[:16]
+        print(
+            f"{device['device_id']:<24} {state:<8} {device['lat']:>10.5f} {device['lon']:>11.5f} "
+            f"{fingerprint} {device['cert_path'] or '-'}"
+        )
+    print(f"[devices] {count} devices, registry version {fetch_registry_version()}")
+
+
+def cmd_seed(args: argparse.Namespace) -> None:
+    count = seed_from_certs(Path(args.certs_dir))
+    print(f"[devices] seeded {count} devices from {args.certs_dir}")
+
+
+def cmd_add(args: argparse.Namespace) -> None:
+    cert_path = key_path = fingerprint = None
+    if args.cert:
+        cert_path, key_path = f"{args.cert}.crt", f"{args.cert}.key"
+        fingerprint = cert_fingerprint(CERTS_DIR / cert_path)
+    upsert_devices(
+        [
+            {
+                "device_id": args.device_id,
+                "cert_fingerprint": fingerprint,
+                "cert_path": cert_path,
+                "key_path": key_path,
+                "lat": args.lat,
+                "lon": args.lon,
+                "enabled": False if args.disabled else None,
+            }
+        ],
+        _now_iso(),
+    )
+    print(f"[devices] upserted {args.device_id}")
+
+
+def cmd_generate(args: argparse.Namespace) -> None:
+    fingerprint = cert_fingerprint(CERTS_DIR / f"{args.cert}.crt")
+    south, west, north, east = args.bbox
+    devices = (
+        {
+            "device_id": f"{args.prefix}{i:0{args.width}d}",
+            "cert_fingerprint": fingerprint,
+            "cert_path": f"{args.cert}.crt",
+            "key_path": f"{args.cert}.key",
+            "lat": round(random.uniform(south, north), 6),
+            "lon": round(random.uniform(west, east), 6),
+        }
+        for i in range(args.count)
+    )
+    start = time.perf_counter()
+    upsert_devices(devices, _now_iso())
+    written = time.perf_counter() - start
+
+    registry = DeviceRegistry()
+    start = time.perf_counter()
+    registry.refresh(force=True)
+    loaded = time.perf_counter() - start
+    probe = [f"{args.prefix}{random.randrange(args.count):0{args.width}d}" for _ in range(100_000)]
+    start = time.perf_counter()
+    allowed = sum(1 for device_id in probe if device_id in registry.enabled)
+    lookup_ns = (time.perf_counter() - start) / len(probe) * 1e9
+    print(
+        f"[devices] wrote {args.count} devices in {written:.2f}s; index of {len(registry.devices)} loaded "
+        f"in {loaded * 1000:.0f}ms; lookup {lookup_ns:.0f}ns ({allowed}/{len(probe)} allowed)"
+    )
+
+
+def cmd_enable(args: argparse.Namespace) -> None:
+    changed = set_devices_enabled(args.device_ids, args.command == "enable", _now_iso())
+    print(f"[devices] {args.command}d {changed} devices")
+
+
+def cmd_remove(args: argparse.Namespace) -> None:
+    print(f"[devices] removed {delete_devices(args.device_ids)} devices")
+
+
+def cmd_gaps(args: argparse.Namespace) -> None:
+    start = args.start
+    if start is None and args.hours:
+        start = (datetime.now(timezone.utc) - timedelta(hours=args.hours)).isoformat().replace("+00:00", "Z")
+    gaps = list(fetch_gaps(args.min_seconds, start, args.end, args.device_ids or None, limit=args.limit))
+    for gap in gaps:
+        expected = f"{gap['expected_interval']:.1f}s" if gap["expected_interval"] is not None else "-"
+        print(
+            f"{gap['device_id']:<24} {gap['start']} -> {gap['end'] or 'still silent':<32} "
+            f"{gap['seconds']:>10.1f}s expected every {expected}"
+        )
+    print(f"[devices] {len(gaps)} gaps of at least {args.min_seconds:g}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the device registry")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="print registered devices")
+    p.add_argument("--enabled", action="store_true", help="only enabled devices")
+    p.add_argument("--limit", type=int, default=50, help="rows to print, 0 for all")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("seed", help="register every device_*.crt in the certs directory")
+    p.add_argument("--certs-dir", default=str(CERTS_DIR))
+    p.set_defaults(func=cmd_seed)
+
+    p = sub.add_parser("add", help="register or update one device")
+    p.add_argument("device_id")
+    p.add_argument("--lat", type=float, required=True)
+    p.add_argument("--lon", type=float, required=True)
+    p.add_argument("--cert", help="certificate name in the certs directory, without extension")
+    p.add_argument("--disabled", action="store_true", help="register disabled, or disable an existing device")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("generate", help="register a synthetic fleet sharing one certificate")
+    p.add_argument("--count", type=int, default=100_000)
+    p.add_argument("--prefix", default="sim_")
+    p.add_argument("--width", type=int, default=6, help="zero-padded digits in generated ids")
+    p.add_argument("--cert", default="device_001", help="certificate the synthetic devices connect with")
+    p.add_argument(
+        "--bbox",
+        type=float,
+        nargs=4,
+        default=[32.5, -124.4, 42.0, -114.1],
+        metavar=("SOUTH", "WEST", "NORTH", "EAST"),
+    )
+    p.set_defaults(func=cmd_generate)
+
+    for name in ("enable", "disable"):
+        p = sub.add_parser(name, help=f"{name} devices; running ingestors pick this up on their next check")
+        p.add_argument("device_ids", nargs="+")
+        p.set_defaults(func=cmd_enable)
+
+    p = sub.add_parser("remove", help="delete devices from the registry")
+    p.add_argument("device_ids", nargs="+")
+    p.set_defaults(func=cmd_remove)
+
+    p = sub.add_parser("gaps", help="report reporting gaps recorded by the ingestor")
+    p.add_argument("device_ids", nargs="*")
+    p.add_argument("--min-seconds", type=float, default=60.0)
+    p.add_argument("--hours", type=float, default=24.0, help="look back this far when --start is not given, 0 for all")
+    p.add_argument("--start", help="ISO-8601 range start")
+    p.add_argument("--end", help="ISO-8601 range end")
+    p.add_argument("--limit", type=int, default=100)
+    p.set_defaults(func=cmd_gaps)
+
+    args = parser.parse_args()
+    if args.func is not cmd_seed:
+        ensure_seeded()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from hydroficient.pipeline.storage import EXPORT_COLUMNS, fetch_device_ids, iter_export_chunks
+
+FORMATS = ("csv", "jsonl")
+NUMERIC_COLUMNS = {"lat", "lon", "ph", "turbidity", "temperature", "flow", "battery"}
+MAX_OPEN_PARTITIONS = 64
+
+
+def _format(path: Path) -> Tuple[str, str]:
+    suffixes = path.suffixes[-2:] if path.suffix == ".gz" else path.suffixes[-1:]
+    fmt = suffixes[0].lstrip(".") if suffixes else ""
+    if fmt not in FORMATS:
+        raise ValueError(f"cannot tell the format of {path.name}; use .csv, .jsonl, .csv.gz or .jsonl.gz")
+    return fmt, "".join(suffixes)
+
+
+def _open(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", compresslevel=6, encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def partition_path(path: Path, partition: str) -> Path:
+    _, ext = _format(path)
+    return path.with_name(f"{path.name[: -len(ext)]}-{partition}{ext}")
+
+
+class ExportWriter:
+    def __init__(self, path: Path, columns: Sequence[str], append: bool = False) -> None:
+        self.path = Path(path)
+        self.columns = tuple(columns)
+        self.format, _ = _format(self.path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = _open(self.path, "a" if append else "w")
+        self.rows = 0
+        if self.format == "csv":
+            self._csv = csv.writer(self._fh, lineterminator="\n")
+            if not append:
+                self._csv.writerow(self.columns)
+
+    def write(self, rows: List[Tuple[Any, ...]]) -> None:
+        if self.format == "csv":
+            self._csv.writerows(rows)
+        else:
+            columns = self.columns
+            self._fh.writelines(json.dumps(dict(zip(columns, row)), separators=(",", ":")) + "\n" for row in rows)
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "ExportWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _value(column: str, value: Any) -> Any:
+    if value == "" or value is None:
+        return None
+    if column in NUMERIC_COLUMNS and isinstance(value, str):
+        return float(value)
+    if column == "detail" and not isinstance(value, str):
+        return json.dumps(value)
+    return value
+
+
+def iter_archive_chunks(
+    path: Path,
+    table: str,
+    device_ids: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    chunk_size: int = 5000,
+) -> Iterator[List[Tuple[Any, ...]]]:
+    # Earlier exports and the mock CSVs share the export columns, so they can be streamed back in.
+    columns = EXPORT_COLUMNS[table]
+    wanted = set(device_ids) if device_ids else None
+    fmt, _ = _format(path)
+    with _open(path, "r") as fh:
+        records = csv.DictReader(fh) if fmt == "csv" else (json.loads(line) for line in fh if line.strip())
+        chunk = []
+        for record in records:
+            ts = record.get("ts") or ""
+            if (start and ts < start) or (end and ts > end):
+                continue
+            if wanted is not None and record.get("device_id") not in wanted:
+                continue
+            chunk.append(tuple(_value(column, record.get(column)) for column in columns))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def export(
+    table: str,
+    out: Path,
+    device_ids: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    archives: Sequence[Path] = (),
+    chunk_size: int = 5000,
+) -> Tuple[Dict[str, int], List[Path]]:
+    counts = {}
+    with ExportWriter(out, EXPORT_COLUMNS[table]) as writer:
+        for archive in archives:
+            before = writer.rows
+            for chunk in iter_archive_chunks(archive, table, device_ids, start, end, chunk_size):
+                writer.write(chunk)
+            counts[str(archive)] = writer.rows - before
+        before = writer.rows
+        for chunk in iter_export_chunks(table, device_ids, start, end, chunk_size):
+            writer.write(chunk)
+        counts["sqlite"] = writer.rows - before
+    return counts, [out]
+
+
+def _export_partition(
+    table: str,
+    out: Path,
+    device_id: str,
+    start: Optional[str],
+    end: Optional[str],
+    chunk_size: int,
+    append: bool,
+) -> int:
+    writer = None
+    try:
+        for chunk in iter_export_chunks(table, [device_id], start, end, chunk_size):
+            if writer is None:
+                writer = ExportWriter(partition_path(out, device_id), EXPORT_COLUMNS[table], append=append)
+            writer.write(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return writer.rows if writer is not None else 0
+
+
+def export_by_device(
+    table: str,
+    out: Path,
+    device_ids: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    archives: Sequence[Path] = (),
+    chunk_size: int = 5000,
+    jobs: int = 4,
+) -> Tuple[Dict[str, int], List[Path]]:
+    from concurrent.futures import ProcessPoolExecutor
+
+    columns = EXPORT_COLUMNS[table]
+    device_index = columns.index("device_id")
+    counts = {}
+    # Archive rows go first, routed into per-device files; a small LRU of open writers bounds file handles.
+    created: Set[str] = set()
+    writers: "OrderedDict[str, ExportWriter]" = OrderedDict()
+    for archive in archives:
+        rows = 0
+        for chunk in iter_archive_chunks(archive, table, device_ids, start, end, chunk_size):
+            groups: Dict[str, List[Tuple[Any, ...]]] = {}
+            for row in chunk:
+                groups.setdefault(row[device_index], []).append(row)
+            for device_id, group in groups.items():
+                writer = writers.pop(device_id, None)
+                if writer is None:
+                    writer = ExportWriter(partition_path(out, device_id), columns, append=device_id in created)
+                    created.add(device_id)
+                writers[device_id] = writer
+                writer.write(group)
+                rows += len(group)
+                if len(writers) > MAX_OPEN_PARTITIONS:
+                    writers.popitem(last=False)[1].close()
+        counts[str(archive)] = rows
+    for writer in writers.values():
+        writer.close()
+
+    partitions = list(device_ids) if device_ids else fetch_device_ids()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(_export_partition, table, out, device_id, start, end, chunk_size, device_id in created)
+            for device_id in partitions
+        ]
+        partition_rows = [future.result() for future in futures]
+    counts["sqlite"] = sum(partition_rows)
+    written = created.union(device_id for device_id, count in zip(partitions, partition_rows) if count)
+    return counts, [partition_path(out, device_id) for device_id in sorted(written)]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = (resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+    return max(usage) / 1024.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream telemetry or security events to CSV/JSONL, optionally gzipped")
+    parser.add_argument("table", choices=sorted(EXPORT_COLUMNS))
+    parser.add_argument("out", help="output file; .csv, .jsonl, .csv.gz or .jsonl.gz")
+    parser.add_argument("--devices", nargs="+", help="only these devices")
+    parser.add_argument("--start", help="ISO-8601 range start")
+    parser.add_argument("--end", help="ISO-8601 range end")
+    parser.add_argument("--archive", nargs="+", default=[], help="CSV/JSONL files (optionally .gz) to include")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per keyset read")
+    parser.add_argument("--by-device", action="store_true", help="write one file per device next to OUT")
+    parser.add_argument("--jobs", type=int, default=4, help="parallel writers with --by-device")
+    args = parser.parse_args()
+    if args.by_device and args.table != "telemetry":
+        parser.error("--by-device is only supported for telemetry")
+
+    out = Path(args.out)
+    try:
+        _format(out)
+    except ValueError as exc:
+        parser.error(str(exc))
+    options = dict(
+        device_ids=args.devices,
+        start=args.start,
+        end=args.end,
+        archives=[Path(p) for p in args.archive],
+        chunk_size=args.chunk_size,
+    )
+    started = time.perf_counter()
+    if args.by_device:
+        counts, written = export_by_device(args.table, out, jobs=args.jobs, **options)
+    else:
+        counts, written = export(args.table, out, **options)
+    elapsed = time.perf_counter() - started
+
+    rows = sum(counts.values())
+    size_mb = sum(path.stat().st_size for path in written) / 1e6
+    for source, count in counts.items():
+        print(f"[export] {source}: {count} rows")
+    peak = _peak_rss_mb()
+    print(
+        f"[export] {rows} rows to {len(written)} file(s), {size_mb:.1f}MB in {elapsed:.2f}s "
+        f"({rows / max(elapsed, 1e-9):,.0f} rows/s)" + (f", peak RSS {peak:.0f}MB" if peak is not None else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
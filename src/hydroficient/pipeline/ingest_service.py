@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Deque, Dict, Optional, Set
+
+import paho.mqtt.client as mqtt
+
+from hydroficient.pipeline.auth import SIGNATURE_FIELD, using_dev_key, verify_payload
+from hydroficient.pipeline.config import CORRELATION, LIVENESS, MQTT, PROFILING, RECENT, SECURITY
+from hydroficient.pipeline.correlator import SecurityCorrelator
+from hydroficient.pipeline.liveness import LivenessTracker
+from hydroficient.pipeline.mqtt_client import Backoff, build_client, install_reconnect_policy, install_session_cache
+from hydroficient.pipeline.profiling import ProfileCapture, Span, SpanTracer, install_signal_handlers
+from hydroficient.pipeline.registry import DeviceRegistry
+from hydroficient.pipeline.storage import (
+    close_gap,
+    fetch_open_gaps,
+    insert_security_event,
+    insert_telemetry,
+    init_db,
+    open_gap,
+    replace_security_windows,
+)
+from hydroficient.pipeline.validator import is_timestamp_recent, validate_payload
+
+if TYPE_CHECKING:
+    from hydroficient.pipeline.ringbuffer import RingBufferWriter
+
+
+class NonceCache:
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.order: Deque[str] = deque()
+        self.cache: Set[str] = set()
+
+    def seen(self, nonce: str) -> bool:
+        return nonce in self.cache
+
+    def add(self, nonce: str) -> None:
+        if nonce in self.cache:
+            return
+        self.cache.add(nonce)
+        self.order.append(nonce)
+        if len(self.order) > self.max_size:
+            oldest = self.order.popleft()
+            self.cache.discard(oldest)
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _epoch(ts: str) -> float:
+    return datetime.fromisoformat(str(ts).replace("Z", "+00:00")).timestamp()
+
+
+class IngestService:
+    def __init__(self) -> None:
+        self.nonce_cache = NonceCache(SECURITY["nonce_cache_size"])
+        self.correlator = SecurityCorrelator()
+        self.registry = DeviceRegistry()
+        self.liveness = LivenessTracker(watched=self.registry.is_allowed)
+        self._liveness_thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.profiler = ProfileCapture("ingest")
+        self.profile_on_connect = 0.0
+        self.tracer = SpanTracer("ingest", PROFILING["trace_sample_rate"])
+        self.recent: Optional["RingBufferWriter"] = None
+        self._recent_overflowed = False
+        self._windows_flushed_at = 0.0
+        # The liveness thread records events and flushes windows alongside the MQTT thread.
+        self._security_lock = threading.RLock()
+        self.client = build_client(MQTT["client_id"], MQTT["client_cert"], MQTT["client_key"])
+        self.client.on_connect = self.on_connect
+        self.client.on_message = self.on_message
+        install_session_cache(self.client)
+        self.backoff = install_reconnect_policy(self.client)
+
+    def on_connect(self, client: mqtt.Client, userdata, flags, rc) -> None:
+        if rc == 0:
+            client.subscribe(MQTT["topic"])
+            print("[pipeline] connected and subscribed")
+            if self.profile_on_connect > 0:
+                # Start-up capture: only once messages can flow, and not again on reconnects.
+                self.profiler.request(self.profile_on_connect)
+                self.profile_on_connect = 0.0
+        else:
+            print(f"[pipeline] connection failed: {rc}")
+
+    def record_security_event(self, event: Dict) -> None:
+        with self._security_lock:
+            insert_security_event(event)
+            for escalation in self.correlator.observe(event.get("device_id"), event["event_type"]):
+                self.record_security_event(escalation)
+
+    def flush_security_windows(self, force: bool = False) -> None:
+        with self._security_lock:
+            now = time.monotonic()
+            if not force and now - self._windows_flushed_at < CORRELATION["flush_interval_seconds"]:
+                return
+            self._windows_flushed_at = now
+            replace_security_windows(self.correlator.snapshot(now), _now_iso())
+
+    def on_message(self, client: mqtt.Client, userdata, msg: mqtt.MQTTMessage) -> None:
+        span = self.tracer.start()
+        if self.profiler.armed:
+            outcome = self.profiler.run(self.process, msg.payload, span)
+        else:
+            outcome = self.process(msg.payload, span)
+        if span:
+            self.tracer.finish(span, outcome)
+
+    def process(self, raw: bytes, span: Optional[Span] = None) -> str:
+        payload_raw = raw.decode("utf-8", errors="ignore")
+        try:
+            payload: Dict = json.loads(payload_raw)
+        except json.JSONDecodeError:
+            self.record_security_event(
+                {
+                    "ts": _now_iso(),
+                    "event_type": "invalid_payload",
+                    "device_id": None,
+                    "severity": "high",
+                    "detail": {"reason": "invalid_json"},
+                }
+            )
+            return "invalid_payload"
+        if span:
+            span.mark("decode")
+
+        valid, errors, range_flags = validate_payload(payload)
+        device_id = payload.get("device_id")
+        if span:
+            span.mark("validate")
+        if not valid:
+            self.record_security_event(
+                {
+                    "ts": _now_iso(),
+                    "event_type": "invalid_payload",
+                    "device_id": device_id,
+                    "severity": "high",
+                    "detail": {"errors": errors},
+                }
+            )
+            return "invalid_payload"
+
+        allowed = self.registry.is_allowed(device_id)
+        if span:
+            span.mark("authorize")
+        if not allowed:
+            self.record_security_event(
+                {
+                    "ts": _now_iso(),
+                    "event_type": "unauthorized_device",
+                    "device_id": device_id,
+                    "severity": "high",
+                    "detail": {
+                        "reason": "device_disabled" if device_id in self.registry.devices else "device_not_whitelisted"
+                    },
+                }
+            )
+            return "unauthorized_device"
+
+        signed = not SECURITY["require_signature"] or verify_payload(payload)
+        if span:
+            span.mark("verify")
+        if not signed:
+            self.record_security_event(
+                {
+                    "ts": _now_iso(),
+                    "event_type": "invalid_signature",
+                    "device_id": device_id,
+                    "severity": "critical",
+                    "detail": {"reason": "missing_signature" if SIGNATURE_FIELD not in payload else "signature_mismatch"},
+                }
+            )
+            return "invalid_signature"
+
+        if not is_timestamp_recent(payload["ts"], SECURITY["max_skew_seconds"]):
+            self.record_security_event(
+                {
+                    "ts": _now_iso(),
+                    "event_type": "stale_message",
+                    "device_id": device_id,
+                    "severity": "medium",
+                    "detail": {"reason": "timestamp_skew"},
+                }
+            )
+
+        nonce = str(payload.get("nonce"))
+        if self.nonce_cache.seen(nonce):
+            self.record_security_event(
+                {
+                    "ts": _now_iso(),
+                    "event_type": "replay_detected",
+                    "device_id": device_id,
+                    "severity": "critical",
+                    "detail": {"nonce": nonce},
+                }
+            )
+            return "replay_detected"
+
+        self.nonce_cache.add(nonce)
+        if span:
+            span.mark("freshness")
+
+        status = "ok"
+        reason = None
+        if range_flags:
+            status = "anomaly"
+            reason = ",".join(range_flags)
+
+        record = {
+            "ts": payload["ts"],
+            "device_id": device_id,
+            "lat": float(payload["lat"]),
+            "lon": float(payload["lon"]),
+            "ph": float(payload["ph"]),
+            "turbidity": float(payload["turbidity"]),
+            "temperature": float(payload["temperature"]),
+            "flow": float(payload["flow"]),
+            "battery": float(payload["battery"]),
+            "nonce": nonce,
+            "status": status,
+            "reason": reason,
+        }
+        insert_telemetry(record)
+        if self.recent is not None:
+            stored = self.recent.append(
+                device_id,
+                _epoch(payload["ts"]),
+                [record[field] for field in self.recent.fields],
+                status == "anomaly",
+                nonce,
+            )
+            if not stored and not self._recent_overflowed:
+                self._recent_overflowed = True
+                print(
+                    f"[pipeline] shared-memory buffer is full at {self.recent.max_devices} devices; "
+                    f"{device_id} and later devices are served from SQL (raise RECENT['max_devices'])"
+                )
+        if span:
+            span.mark("store")
+        gap = self.liveness.observe(device_id)
+        if gap:
+            close_gap(
+                device_id,
+                _iso(gap["start"]),
+                _iso(gap["end"]),
+                gap["end"] - gap["start"],
+                gap["expected_interval"],
+            )
+        for escalation in self.correlator.observe_status(device_id, status):
+            self.record_security_event(escalation)
+        if span:
+            span.mark("correlate")
+        return status
+
+    def check_liveness(self) -> None:
+        for silent in self.liveness.expire():
+            interval = silent["expected_interval"]
+            open_gap(silent["device_id"], _iso(silent["last_seen"]), interval)
+            self.record_security_event(
+                {
+                    "ts": _now_iso(),
+                    "event_type": "device_silent",
+                    "device_id": silent["device_id"],
+                    "severity": "medium",
+                    "detail": {
+                        "last_seen": _iso(silent["last_seen"]),
+                        "silent_seconds": round(silent["silent_seconds"], 1),
+                        "expected_interval_seconds": None if interval is None else round(interval, 2),
+                    },
+                }
+            )
+
+    def _watch_liveness(self) -> None:
+        # Also flushes the correlation windows, so they age out on the dashboard even when no messages arrive.
+        interval = min(LIVENESS["poll_interval_seconds"], CORRELATION["flush_interval_seconds"])
+        while not self._stopping.wait(interval):
+            try:
+                self.check_liveness()
+            except Exception as exc:
+                print(f"[pipeline] liveness check failed: {exc}")
+            try:
+                self.flush_security_windows()
+            except Exception as exc:
+                print(f"[pipeline] window flush failed: {exc}")
+
+    def start(self) -> None:
+        init_db()
+        if install_signal_handlers(self.profiler, self.tracer):
+            print("[pipeline] SIGUSR1 captures a profile, SIGUSR2 toggles span sampling")
+        if RECENT["enabled"] and self.recent is None:
+            # numpy is only needed once we are actually serving readings.
+            from hydroficient.pipeline.ringbuffer import RingBufferWriter
+
+            self.recent = RingBufferWriter.create()
+            print(f"[pipeline] recent readings in shared memory '{RECENT['shm_name']}'")
+        self.registry.refresh(force=True)
+        print(f"[pipeline] registry v{self.registry.version}: {len(self.registry.enabled)} enabled devices")
+        if self._liveness_thread is None:
+            self.liveness.resume({device_id: _epoch(ts) for device_id, ts in fetch_open_gaps().items()})
+            self.liveness.watch(self.registry.enabled)
+            self._liveness_thread = threading.Thread(target=self._watch_liveness, name="liveness", daemon=True)
+            self._liveness_thread.start()
+        self.client.connect_async(MQTT["host"], MQTT["port"], keepalive=60)
+        self.client.loop_forever(retry_first_connection=True)
+
+    def close(self) -> None:
+        self._stopping.set()
+        if self.recent is not None:
+            self.recent.close()
+            self.recent = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest signed telemetry from the MQTT broker")
+    parser.add_argument(
+        "--profile-seconds",
+        type=float,
+        default=PROFILING["profile_seconds"],
+        help="capture a cProfile of on_message for this long after first connecting",
+    )
+    parser.add_argument(
+        "--trace-sample-rate",
+        type=float,
+        default=PROFILING["trace_sample_rate"],
+        help="fraction of messages to record stage spans for",
+    )
+    parser.add_argument(
+        "--allow-dev-key",
+        action="store_true",
+        help="verify signatures with the public development key when HYDRO_HMAC_MASTER_KEY is unset",
+    )
+    args = parser.parse_args()
+
+    if SECURITY["require_signature"] and using_dev_key():
+        if not args.allow_dev_key:
+            print(
+                "[security] HYDRO_HMAC_MASTER_KEY is not set; refusing to accept signatures made with the public "
+                "development key. Set it, or pass --allow-dev-key for local testing."
+            )
+            sys.exit(2)
+        print("[security] WARNING: using the public development HMAC key; anyone can forge device signatures")
+
+    service = IngestService()
+    service.tracer.set_rate(args.trace_sample_rate)
+    service.profile_on_connect = args.profile_seconds
+    backoff = Backoff()
+    try:
+        while True:
+            try:
+                service.start()
+                backoff.reset()
+            except Exception as exc:
+                delay = backoff.next_delay()
+                print(f"[pipeline] error: {exc}; retrying in {delay:.1f}s")
+                time.sleep(delay)
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import LIVENESS
+
+
+class DeviceClock:
+    __slots__ = ("last_seen", "reported", "interval", "deadline", "queued", "silent_since")
+
+    def __init__(self, last_seen: float, reported: bool) -> None:
+        self.last_seen = last_seen
+        self.reported = reported
+        self.interval: Optional[float] = None
+        self.deadline = 0.0
+        self.queued: Optional[float] = None
+        self.silent_since: Optional[float] = None
+
+
+# Each device keeps an EWMA of its report interval and one live entry in a heap of deadlines. A report
+# that pushes the deadline later only updates the clock, and the entry is re-pushed when it surfaces;
+# only a deadline moving earlier needs a new entry. Reports are O(1) amortised, expiries O(log n).
+class LivenessTracker:
+    def __init__(
+        self,
+        watched: Optional[Callable[[str], bool]] = None,
+        alpha: float = LIVENESS["ewma_alpha"],
+        factor: float = LIVENESS["silence_factor"],
+        min_silence: float = LIVENESS["min_silence_seconds"],
+        default_interval: float = LIVENESS["default_interval_seconds"],
+    ) -> None:
+        self.watched = watched
+        self.alpha = alpha
+        self.factor = factor
+        self.min_silence = min_silence
+        self.default_interval = default_interval
+        self.clocks: Dict[str, DeviceClock] = {}
+        self.heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def _allowance(self, clock: DeviceClock) -> float:
+        interval = self.default_interval if clock.interval is None else clock.interval
+        return max(self.min_silence, self.factor * interval)
+
+    def _schedule(self, device_id: str, clock: DeviceClock) -> None:
+        clock.deadline = clock.last_seen + self._allowance(clock)
+        if clock.queued is None or clock.deadline < clock.queued:
+            clock.queued = clock.deadline
+            heapq.heappush(self.heap, (clock.deadline, device_id))
+
+    def watch(self, device_ids: Iterable[str], now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            for device_id in device_ids:
+                if device_id not in self.clocks:
+                    clock = self.clocks[device_id] = DeviceClock(now, False)
+                    self._schedule(device_id, clock)
+
+    def resume(self, silent: Dict[str, float], now: Optional[float] = None) -> None:
+        # Gaps still open when the previous ingestor stopped; the next report closes them.
+        now = time.time() if now is None else now
+        with self._lock:
+            for device_id, since in silent.items():
+                clock = self.clocks.setdefault(device_id, DeviceClock(now, False))
+                clock.silent_since = since
+
+    def observe(self, device_id: str, now: Optional[float] = None) -> Optional[Dict]:
+        now = time.time() if now is None else now
+        with self._lock:
+            clock = self.clocks.get(device_id)
+            if clock is None:
+                clock = self.clocks[device_id] = DeviceClock(now, True)
+                self._schedule(device_id, clock)
+                return None
+            gap = None
+            if clock.silent_since is not None or now > clock.deadline:
+                # Also catches a late report that arrived before the poll noticed the missed deadline.
+                gap = {
+                    "device_id": device_id,
+                    "start": clock.last_seen if clock.silent_since is None else clock.silent_since,
+                    "end": now,
+                    "expected_interval": clock.interval,
+                }
+                clock.silent_since = None
+            elif clock.reported:
+                elapsed = now - clock.last_seen
+                clock.interval = (
+                    elapsed if clock.interval is None else self.alpha * elapsed + (1 - self.alpha) * clock.interval
+                )
+            clock.last_seen = now
+            clock.reported = True
+            self._schedule(device_id, clock)
+            return gap
+
+    def expire(self, now: Optional[float] = None) -> List[Dict]:
+        now = time.time() if now is None else now
+        due = []
+        with self._lock:
+            while self.heap and self.heap[0][0] <= now:
+                deadline, device_id = heapq.heappop(self.heap)
+                clock = self.clocks.get(device_id)
+                if clock is None or clock.queued != deadline:
+                    # Superseded by an earlier deadline, or the device was dropped.
+                    continue
+                clock.queued = None
+                if clock.silent_since is not None:
+                    continue
+                if clock.deadline > now:
+                    # Reported since this entry was pushed.
+                    clock.queued = clock.deadline
+                    heapq.heappush(self.heap, (clock.deadline, device_id))
+                    continue
+                due.append((device_id, clock))
+        # watched may refresh the registry from SQLite; observe() must not wait behind that.
+        allowed = {device_id: self.watched is None or self.watched(device_id) for device_id, _ in due}
+        silent = []
+        with self._lock:
+            for device_id, clock in due:
+                if self.clocks.get(device_id) is not clock or clock.silent_since is not None or clock.deadline > now:
+                    # Reported (and rescheduled) while the lock was released.
+                    continue
+                if not allowed[device_id]:
+                    del self.clocks[device_id]
+                    continue
+                clock.silent_since = clock.last_seen
+                silent.append(
+                    {
+                        "device_id": device_id,
+                        "last_seen": clock.last_seen,
+                        "expected_interval": clock.interval,
+                        "silent_seconds": now - clock.last_seen,
+                    }
+                )
+        return silent
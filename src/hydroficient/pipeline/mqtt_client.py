@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import random
+import ssl
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
+
+import paho.mqtt.client as mqtt
+
+from .config import MQTT, RECONNECT
+
+
+class SessionCachingContext(ssl.SSLContext):
+    def __new__(cls) -> "SessionCachingContext":
+        return super().__new__(cls, ssl.PROTOCOL_TLS_CLIENT)
+
+    def __init__(self) -> None:
+        self._sessions: Dict[Optional[str], ssl.SSLSession] = {}
+        self._sessions_lock = threading.Lock()
+
+    def wrap_socket(self, sock, *args, **kwargs):
+        if not kwargs.get("server_side") and kwargs.get("session") is None:
+            with self._sessions_lock:
+                kwargs["session"] = self._sessions.get(kwargs.get("server_hostname"))
+        return super().wrap_socket(sock, *args, **kwargs)
+
+    def remember(self, server_hostname: Optional[str], session: Optional[ssl.SSLSession]) -> None:
+        if session is None:
+            return
+        with self._sessions_lock:
+            self._sessions[server_hostname] = session
+
+
+@lru_cache(maxsize=None)
+def client_context(certfile: str, keyfile: str, ca_certs: str = MQTT["ca_cert"]) -> SessionCachingContext:
+    context = SessionCachingContext()
+    context.load_verify_locations(cafile=ca_certs)
+    context.load_cert_chain(certfile=certfile, keyfile=keyfile)
+    return context
+
+
+def remember_session(client: mqtt.Client) -> bool:
+    sock = client.socket()
+    if not isinstance(sock, ssl.SSLSocket) or not isinstance(sock.context, SessionCachingContext):
+        return False
+    sock.context.remember(sock.server_hostname, sock.session)
+    return sock.session_reused
+
+
+def install_session_cache(client: mqtt.Client) -> None:
+    # Independent of the reconnect policy, so a client that only changes its retry timing still resumes.
+    user_on_connect = client.on_connect
+
+    def on_connect(c: mqtt.Client, userdata, flags, rc, *extra) -> None:
+        if rc == 0:
+            remember_session(c)
+        if user_on_connect:
+            user_on_connect(c, userdata, flags, rc, *extra)
+
+    client.on_connect = on_connect
+
+
+class Backoff:
+    def __init__(self, base: float = RECONNECT["base_delay"], cap: float = RECONNECT["max_delay"]) -> None:
+        self.base = base
+        self.cap = cap
+        self.attempt = 0
+
+    def next_delay(self) -> float:
+        delay = random.uniform(0, min(self.cap, self.base * (2 ** self.attempt)))
+        self.attempt = min(self.attempt + 1, 32)
+        return delay
+
+    def reset(self) -> None:
+        self.attempt = 0
+
+
+def install_reconnect_policy(client: mqtt.Client, backoff: Optional[Backoff] = None) -> Backoff:
+    backoff = backoff or Backoff()
+    user_on_connect = client.on_connect
+    user_on_disconnect = client.on_disconnect
+
+    def schedule_retry(c: mqtt.Client) -> None:
+        c.reconnect_delay_set(min_delay=backoff.next_delay(), max_delay=backoff.cap)
+
+    def on_connect(c: mqtt.Client, userdata, flags, rc, *extra) -> None:
+        if rc == 0:
+            backoff.reset()
+        if user_on_connect:
+            user_on_connect(c, userdata, flags, rc, *extra)
+
+    def on_disconnect(c: mqtt.Client, userdata, rc, *extra) -> None:
+        schedule_retry(c)
+        if user_on_disconnect:
+            user_on_disconnect(c, userdata, rc, *extra)
+
+    client.on_connect = on_connect
+    client.on_disconnect = on_disconnect
+    client.on_connect_fail = lambda c, userdata: schedule_retry(c)
+    schedule_retry(client)
+    return backoff
+
+
+def build_client(client_id: str, certfile: str, keyfile: str) -> mqtt.Client:
+    client = mqtt.Client(client_id=client_id, protocol=mqtt.MQTTv311)
+    client.tls_set_context(client_context(str(certfile), str(keyfile)))
+    return client
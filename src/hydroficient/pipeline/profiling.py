@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import os
+import signal
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from .config import PROFILING
+
+if TYPE_CHECKING:
+    import cProfile
+
+
+def _stamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+class ProfileCapture:
+    def __init__(self, name: str, out_dir: Path = PROFILING["dir"]) -> None:
+        self.name = name
+        self.out_dir = Path(out_dir)
+        self.armed = False
+        self.profile: Optional[cProfile.Profile] = None
+        self.calls = 0
+        # Re-entrant: the signal handler runs on the thread that may be inside run().
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+    def request(self, seconds: float) -> None:
+        with self._lock:
+            if self.armed:
+                return
+            import cProfile
+
+            self.profile = cProfile.Profile()
+            self.calls = 0
+            self.armed = True
+            self._timer = threading.Timer(seconds, self.finish)
+            self._timer.daemon = True
+            self._timer.start()
+        print(f"[profile] capturing {self.name} for {seconds:.0f}s")
+
+    def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            profile = self.profile if self.armed else None
+            if profile is None:
+                return func(*args)
+            profile.enable()
+            try:
+                return func(*args)
+            finally:
+                profile.disable()
+                self.calls += 1
+
+    def finish(self) -> Optional[Path]:
+        with self._lock:
+            if not self.armed:
+                return None
+            self.armed = False
+            profile, self.profile = self.profile, None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self.calls == 0:
+            # pstats refuses a profile that never ran; nothing useful to write either.
+            print(f"[profile] no {self.name} calls during the capture; nothing written")
+            return None
+        import io
+        import pstats
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / f"{self.name}-{_stamp()}-{os.getpid()}.prof"
+        stats = pstats.Stats(profile)
+        stats.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(PROFILING["top_functions"])
+        path.with_suffix(".txt").write_text(f"{self.calls} calls profiled\n{summary.getvalue()}")
+        print(f"[profile] wrote {path} ({self.calls} calls)")
+        return path
+
+
+class Span:
+    __slots__ = ("trace_id", "started", "last", "stages")
+
+    def __init__(self) -> None:
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.started = self.last = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.stages[stage] = round((now - self.last) * 1e6, 1)
+        self.last = now
+
+
+class SpanTracer:
+    def __init__(self, name: str, rate: float = 0.0, out_dir: Path = PROFILING["dir"]) -> None:
+        self.path = Path(out_dir) / f"{name}-spans-{os.getpid()}.jsonl"
+        self.every = 0
+        self._count = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self.set_rate(rate)
+
+    def set_rate(self, rate: float) -> None:
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._count = 0
+
+    def toggle(self, rate: float = PROFILING["signal_trace_sample_rate"]) -> None:
+        self.set_rate(0.0 if self.every else rate)
+        print(f"[trace] span sampling {'1/' + str(self.every) if self.every else 'off'} -> {self.path}")
+
+    def start(self) -> Optional[Span]:
+        if not self.every:
+            return None
+        self._count += 1
+        if self._count < self.every:
+            return None
+        self._count = 0
+        return Span()
+
+    def finish(self, span: Span, outcome: str) -> None:
+        record = {
+            "trace_id": span.trace_id,
+            "ts": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "outcome": outcome,
+            "total_us": round((time.perf_counter() - span.started) * 1e6, 1),
+            "stages": span.stages,
+        }
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a", encoding="utf-8")
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def install_signal_handlers(capture: ProfileCapture, tracer: SpanTracer) -> bool:
+    if threading.current_thread() is not threading.main_thread() or not hasattr(signal, "SIGUSR1"):
+        return False
+    signal.signal(signal.SIGUSR1, lambda signum, frame: capture.request(PROFILING["signal_profile_seconds"]))
+    signal.signal(signal.SIGUSR2, lambda signum, frame: tracer.toggle())
+    return True
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from hydroficient.pipeline import storage
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def _synthetic_rows(count: int, devices: int, rows_per_hour: int, now: datetime, offset: int):
+    for i in range(offset, offset + count):
+        yield {
+            "ts": _iso(now - timedelta(hours=i / rows_per_hour)),
+            "device_id": f"device_{i % devices:05d}",
+            "lat": 36.0 + random.random(),
+            "lon": -120.0 + random.random(),
+            "ph": random.uniform(6.5, 8.5),
+            "turbidity": random.uniform(1.0, 50.0),
+            "temperature": random.uniform(10.0, 28.0),
+            "flow": random.uniform(10.0, 120.0),
+            "battery": random.uniform(40.0, 100.0),
+            "nonce": f"bench-{i}",
+            "status": "ok",
+            "reason": None,
+        }
+
+
+def _time_query(device_id: str, start: str, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        list(storage.query_telemetry(device_ids=[device_id], start=start))
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(samples)
+
+
+def _check_export_plans(devices: int) -> None:
+    # Exports must stay index-ordered: a temp B-tree re-sorts every match on each keyset page.
+    sample = [f"device_{i:05d}" for i in range(min(devices, 4))]
+    for device_ids in (None, sample[:1], sample):
+        plan = storage.explain_export("telemetry", device_ids)
+        label = "all devices" if device_ids is None else f"{len(device_ids)} device(s)"
+        if any("TEMP B-TREE" in detail for detail in plan):
+            raise SystemExit(f"[bench] export plan for {label} sorts in a temp B-tree: {plan}")
+        print(f"[bench] export plan for {label}: {'; '.join(sorted(set(plan)))}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark 'device X, last hour' as the telemetry table grows")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--rows-per-hour", type=int, default=3600, help="fleet-wide ingest rate of the synthetic history")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--db", help="database file to use (default: a temporary file)")
+    args = parser.parse_args()
+
+    storage.DB_PATH = Path(args.db) if args.db else Path(tempfile.mkdtemp()) / "query_benchmark.db"
+    storage.init_db()
+
+    now = datetime.now(timezone.utc)
+    inserted = 0
+    print(f"[bench] db={storage.DB_PATH} devices={args.devices} rows_per_hour={args.rows_per_hour}")
+    print(f"{'rows':>10} {'matches':>8} {'median_ms':>10}")
+    for size in sorted(args.sizes):
+        # Growth extends history backwards, so the last hour holds the same rows at every size.
+        while inserted < size:
+            batch = min(size - inserted, 50_000)
+            storage.insert_telemetry_batch(_synthetic_rows(batch, args.devices, args.rows_per_hour, now, inserted))
+            inserted += batch
+        start = _iso(now - timedelta(hours=1))
+        matches = len(list(storage.query_telemetry(device_ids=["device_00000"], start=start)))
+        median_ms = _time_query("device_00000", start, args.repeats)
+        print(f"{size:>10} {matches:>8} {median_ms:>10.3f}")
+    _check_export_plans(args.devices)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .config import CERTS_DIR, REGISTRY
+from .storage import fetch_devices, fetch_registry_version, fetch_removed_devices, upsert_devices
+
+
+class Device(NamedTuple):
+    device_id: str
+    cert_fingerprint: Optional[str]
+    cert_path: Optional[str]
+    key_path: Optional[str]
+    lat: float
+    lon: float
+    enabled: bool
+
+    @property
+    def home(self) -> Tuple[float, float]:
+        return self.lat, self.lon
+
+    def cert_files(self) -> Optional[Tuple[Path, Path]]:
+        if not self.cert_path or not self.key_path:
+            return None
+        return CERTS_DIR / self.cert_path, CERTS_DIR / self.key_path
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def cert_fingerprint(path: Path) -> str:
+    import ssl
+
+    der = ssl.PEM_cert_to_DER_cert(Path(path).read_text())
+    return hashlib.sha256(der).hexdigest()
+
+
+def devices_from_certs(certs_dir: Path = CERTS_DIR) -> List[Dict]:
+    devices = []
+    for cert in sorted(certs_dir.glob("device_*.crt")):
+        key = cert.with_suffix(".key")
+        lat, lon = REGISTRY["seed_locations"].get(cert.stem, REGISTRY["default_location"])
+        devices.append(
+            {
+                "device_id": cert.stem,
+                "cert_fingerprint": cert_fingerprint(cert),
+                "cert_path": cert.name,
+                "key_path": key.name if key.exists() else None,
+                "lat": lat,
+                "lon": lon,
+            }
+        )
+    return devices
+
+
+def seed_from_certs(certs_dir: Path = CERTS_DIR) -> int:
+    devices = devices_from_certs(certs_dir)
+    upsert_devices(devices, _now_iso())
+    return len(devices)
+
+
+def ensure_seeded() -> int:
+    version = fetch_registry_version()
+    if version == 0 and REGISTRY["seed_from_certs"]:
+        seed_from_certs()
+        version = fetch_registry_version()
+    return version
+
+
+class DeviceRegistry:
+    def __init__(self, check_interval: float = REGISTRY["check_interval_seconds"]) -> None:
+        self.check_interval = check_interval
+        self.version = -1
+        self.devices: Dict[str, Device] = {}
+        self.enabled: Set[str] = set()
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> bool:
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return False
+        with self._lock:
+            if not force and now - self._checked_at < self.check_interval:
+                return False
+            self._checked_at = now
+            version = ensure_seeded()
+            if version == self.version:
+                return False
+            # Apply only what changed since the loaded version; removals first so a re-added id survives.
+            for device_id in fetch_removed_devices(self.version):
+                self.devices.pop(device_id, None)
+                self.enabled.discard(device_id)
+            for row in fetch_devices(since_version=self.version):
+                device = Device(**{field: row[field] for field in Device._fields})
+                self.devices[device.device_id] = device
+                if device.enabled:
+                    self.enabled.add(device.device_id)
+                else:
+                    self.enabled.discard(device.device_id)
+            self.version = version
+            return True
+
+    def is_allowed(self, device_id: Optional[str]) -> bool:
+        self.refresh()
+        return device_id in self.enabled
+
+    def get(self, device_id: str) -> Optional[Device]:
+        self.refresh()
+        return self.devices.get(device_id)
+
+    def enabled_devices(self, with_certs: bool = False) -> List[Device]:
+        self.refresh()
+        devices = self.devices
+        return [
+            devices[device_id]
+            for device_id in sorted(self.enabled)
+            if not with_certs or devices[device_id].cert_files() is not None
+        ]
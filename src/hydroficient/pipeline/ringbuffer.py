@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .config import RECENT
+
+MAGIC = 0x48594452524E4701
+VALUE_FIELDS = ("lat", "lon", "ph", "turbidity", "temperature", "flow", "battery")
+ID_BYTES = 64
+NONCE_BYTES = 48
+HEADER_FIELDS = ("magic", "capacity", "max_devices", "device_count", "dropped")
+ARRAYS = ("header", "ids", "seq", "head", "ts", "values", "anomaly", "nonce")
+
+# Segments created by this process stay registered with its resource tracker.
+_created: Set[str] = set()
+
+
+def _layout(capacity: int, max_devices: int) -> Tuple[Dict[str, Tuple[int, Tuple[int, ...], np.dtype]], int]:
+    specs = (
+        ("header", (len(HEADER_FIELDS),), np.int64),
+        ("ids", (max_devices,), f"S{ID_BYTES}"),
+        ("seq", (max_devices,), np.int64),
+        ("head", (max_devices,), np.int64),
+        ("ts", (max_devices, capacity), np.float64),
+        ("values", (max_devices, capacity, len(VALUE_FIELDS)), np.float64),
+        ("anomaly", (max_devices, capacity), np.uint8),
+        ("nonce", (max_devices, capacity), f"S{NONCE_BYTES}"),
+    )
+    layout = {}
+    offset = 0
+    for name, shape, dtype in specs:
+        dtype = np.dtype(dtype)
+        layout[name] = (offset, shape, dtype)
+        offset += -(-int(np.prod(shape)) * dtype.itemsize // 8) * 8
+    return layout, offset
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if name in _created:
+            return shm
+        # Before Python 3.13 attaching registers the segment with this process's resource
+        # tracker, which would unlink it from under the ingestor when we exit.
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class _RingBuffer:
+    fields = VALUE_FIELDS
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, max_devices: int) -> None:
+        self.shm = shm
+        self.capacity = capacity
+        self.max_devices = max_devices
+        layout, _ = _layout(capacity, max_devices)
+        for name, (offset, shape, dtype) in layout.items():
+            setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset))
+
+    def close(self) -> None:
+        # The numpy views export the mapping; drop them before closing it.
+        for name in ARRAYS:
+            setattr(self, name, None)
+        self.shm.close()
+
+
+class RingBufferWriter(_RingBuffer):
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, max_devices: int) -> None:
+        super().__init__(shm, capacity, max_devices)
+        self.slots: Dict[str, int] = {}
+
+    @classmethod
+    def create(
+        cls,
+        name: str = RECENT["shm_name"],
+        capacity: int = RECENT["capacity"],
+        max_devices: int = RECENT["max_devices"],
+    ) -> "RingBufferWriter":
+        _, size = _layout(capacity, max_devices)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by an ingestor that did not shut down cleanly; retire it so readers re-attach.
+            stale = _attach(name)
+            if stale.size >= 8:
+                np.ndarray((1,), dtype=np.int64, buffer=stale.buf)[0] = 0
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _created.add(name)
+        writer = cls(shm, capacity, max_devices)
+        writer.ts.fill(np.nan)
+        writer.header[1:] = (capacity, max_devices, 0, 0)
+        writer.header[0] = MAGIC
+        return writer
+
+    def append(self, device_id: str, ts: float, values: Sequence[float], anomaly: bool, nonce: str) -> bool:
+        slot = self.slots.get(device_id)
+        if slot is None:
+            slot = len(self.slots)
+            if slot >= self.max_devices:
+                self.header[4] += 1
+                return False
+            self.ids[slot] = device_id.encode("utf-8")[:ID_BYTES]
+            self.slots[device_id] = slot
+            self.header[3] = slot + 1
+        # Seqlock: odd while the slot is being written, readers retry until they see the same even value twice.
+        self.seq[slot] += 1
+        pos = self.head[slot] % self.capacity
+        self.ts[slot, pos] = ts
+        self.values[slot, pos] = values
+        self.anomaly[slot, pos] = anomaly
+        self.nonce[slot, pos] = nonce.encode("utf-8")[:NONCE_BYTES]
+        self.head[slot] += 1
+        self.seq[slot] += 1
+        return True
+
+    def close(self, unlink: bool = True) -> None:
+        self.header[0] = 0
+        if unlink:
+            self.shm.unlink()
+            _created.discard(self.shm.name.lstrip("/"))
+        super().close()
+
+
+class RingBufferReader(_RingBuffer):
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, max_devices: int) -> None:
+        super().__init__(shm, capacity, max_devices)
+        self._slots: Dict[str, int] = {}
+
+    @classmethod
+    def attach(cls, name: str = RECENT["shm_name"]) -> Optional["RingBufferReader"]:
+        try:
+            shm = _attach(name)
+        except FileNotFoundError:
+            return None
+        header = np.ndarray((len(HEADER_FIELDS),), dtype=np.int64, buffer=shm.buf)
+        magic, capacity, max_devices = int(header[0]), int(header[1]), int(header[2])
+        del header
+        if magic != MAGIC:
+            shm.close()
+            return None
+        return cls(shm, capacity, max_devices)
+
+    @property
+    def alive(self) -> bool:
+        return self.header is not None and int(self.header[0]) == MAGIC
+
+    @property
+    def dropped(self) -> int:
+        return int(self.header[4])
+
+    def covers(self, device_ids: Optional[Sequence[str]] = None) -> bool:
+        # Once a device has been turned away for lack of a slot, or a requested one has none, SQL must answer.
+        if self.dropped:
+            return False
+        mapping = self._slot_map()
+        return all(device_id in mapping for device_id in device_ids or ())
+
+    def devices(self) -> List[str]:
+        return list(self._slot_map())
+
+    def _slot_map(self) -> Dict[str, int]:
+        count = int(self.header[3])
+        for slot in range(len(self._slots), count):
+            self._slots[self.ids[slot].decode("utf-8")] = slot
+        return self._slots
+
+    def _gather(self, slots: np.ndarray, k: int) -> Tuple[np.ndarray, ...]:
+        back = np.arange(k)
+
+        def copy(rows: np.ndarray) -> Tuple[np.ndarray, ...]:
+            heads = self.head[rows]
+            cols = (heads[:, None] - 1 - back) % self.capacity
+            index = (rows[:, None], cols)
+            filled = back < np.minimum(heads, self.capacity)[:, None]
+            return self.ts[index], self.values[index], self.anomaly[index], self.nonce[index], filled
+
+        before = self.seq[slots]
+        ts, values, anomaly, nonce, filled = copy(slots)
+        after = self.seq[slots]
+        for i in np.flatnonzero((before != after) | (before % 2 == 1)):
+            row = slots[i : i + 1]
+            for _ in range(1000):
+                start = int(self.seq[row[0]])
+                fresh = copy(row)
+                if start % 2 == 0 and int(self.seq[row[0]]) == start:
+                    break
+            ts[i], values[i], anomaly[i], nonce[i], filled[i] = (part[0] for part in fresh)
+        return ts, values, anomaly, nonce, filled
+
+    def recent(
+        self,
+        device_ids: Optional[Sequence[str]] = None,
+        n: int = 30,
+        since: Optional[float] = None,
+    ) -> Dict[str, np.ndarray]:
+        mapping = self._slot_map()
+        names = [d for d in device_ids if d in mapping] if device_ids else list(mapping)
+        slots = np.fromiter((mapping[d] for d in names), dtype=np.int64, count=len(names))
+        ts, values, anomaly, nonce, filled = self._gather(slots, min(n, self.capacity))
+        if since is not None:
+            filled &= np.nan_to_num(ts, nan=-np.inf) >= since
+        rows, cols = np.nonzero(filled)
+        order = np.argsort(ts[rows, cols], kind="stable")[-n:]
+        rows, cols = rows[order], cols[order]
+        readings: Dict[str, np.ndarray] = {
+            "ts": ts[rows, cols],
+            "device_id": np.asarray(names, dtype=object)[rows] if names else np.empty(0, dtype=object),
+        }
+        for i, field in enumerate(VALUE_FIELDS):
+            readings[field] = values[rows, cols, i]
+        readings["status"] = np.where(anomaly[rows, cols] != 0, "anomaly", "ok").astype(object)
+        readings["nonce"] = np.char.decode(nonce[rows, cols], "utf-8").astype(object)
+        return readings
+
+    def last(self, device_id: str, n: int = 1) -> Dict[str, np.ndarray]:
+        return self.recent([device_id], n)
+
+    def latest(self, device_id: str) -> Optional[Dict[str, Any]]:
+        readings = self.last(device_id, 1)
+        if not len(readings["ts"]):
+            return None
+        return {key: column[0].item() if hasattr(column[0], "item") else column[0] for key, column in readings.items()}
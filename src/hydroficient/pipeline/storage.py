@@ -0,0 +1,1199 @@
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .config import DATA_DIR, SPATIAL
+
+DB_PATH = DATA_DIR / "pipeline.db"
+
+TREND_METRICS = ("ph", "turbidity", "temperature", "flow", "battery")
+
+TELEMETRY_COLUMNS = (
+    "ts",
+    "device_id",
+    "lat",
+    "lon",
+    "ph",
+    "turbidity",
+    "temperature",
+    "flow",
+    "battery",
+    "nonce",
+    "status",
+    "reason",
+)
+
+EXPORT_COLUMNS = {
+    "telemetry": TELEMETRY_COLUMNS,
+    "security_events": ("ts", "event_type", "device_id", "severity", "detail"),
+}
+
+DEVICE_COLUMNS = (
+    "device_id",
+    "cert_fingerprint",
+    "cert_path",
+    "key_path",
+    "lat",
+    "lon",
+    "enabled",
+    "updated",
+    "version",
+)
+
+REGISTRY_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_devices_insert_version AFTER INSERT ON devices
+    BEGIN
+        UPDATE registry_version SET version = version + 1 WHERE id = 0;
+        UPDATE devices SET version = (SELECT version FROM registry_version WHERE id = 0)
+        WHERE device_id = NEW.device_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_devices_update_version
+    AFTER UPDATE OF cert_fingerprint, cert_path, key_path, lat, lon, enabled ON devices
+    WHEN OLD.cert_fingerprint IS NOT NEW.cert_fingerprint
+        OR OLD.cert_path IS NOT NEW.cert_path
+        OR OLD.key_path IS NOT NEW.key_path
+        OR OLD.lat IS NOT NEW.lat
+        OR OLD.lon IS NOT NEW.lon
+        OR OLD.enabled IS NOT NEW.enabled
+    BEGIN
+        UPDATE registry_version SET version = version + 1 WHERE id = 0;
+        UPDATE devices SET version = (SELECT version FROM registry_version WHERE id = 0)
+        WHERE device_id = NEW.device_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_devices_delete_version AFTER DELETE ON devices
+    BEGIN
+        UPDATE registry_version SET version = version + 1 WHERE id = 0;
+        INSERT OR REPLACE INTO device_tombstones (device_id, version)
+        SELECT OLD.device_id, version FROM registry_version WHERE id = 0;
+    END
+    """,
+)
+
+COUNTER_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_telemetry_counters AFTER INSERT ON telemetry
+    BEGIN
+        INSERT INTO pipeline_counters (scope, key, name, value)
+        SELECT 'total', '', 'devices', 1
+        WHERE NOT EXISTS (
+            SELECT 1 FROM pipeline_counters WHERE scope = 'device' AND key = NEW.device_id AND name = 'messages'
+        )
+        ON CONFLICT (scope, key, name) DO UPDATE SET value = value + 1;
+        INSERT INTO pipeline_counters (scope, key, name, value)
+        VALUES ('device', NEW.device_id, 'messages', 1), ('total', '', 'messages', 1)
+        ON CONFLICT (scope, key, name) DO UPDATE SET value = value + 1;
+        INSERT INTO pipeline_counters (scope, key, name, value)
+        SELECT scope, key, 'anomalies', 1
+        FROM (SELECT 'device' AS scope, NEW.device_id AS key UNION ALL SELECT 'total', '')
+        WHERE NEW.status = 'anomaly'
+        ON CONFLICT (scope, key, name) DO UPDATE SET value = value + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_security_events_counters AFTER INSERT ON security_events
+    BEGIN
+        INSERT INTO pipeline_counters (scope, key, name, value)
+        VALUES ('event_type', NEW.event_type, 'events', 1)
+        ON CONFLICT (scope, key, name) DO UPDATE SET value = value + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tls_metrics_counters AFTER INSERT ON tls_metrics
+    BEGIN
+        INSERT INTO pipeline_counters (scope, key, name, value)
+        VALUES ('total', '', 'tls_attempts', 1), ('total', '', 'tls_handshakes', NEW.success != 0)
+        ON CONFLICT (scope, key, name) DO UPDATE SET value = value + excluded.value;
+    END
+    """,
+)
+
+POSITION_COLUMNS = ("device_id", "ts", "lat", "lon", "status")
+
+CELL_DEGREES = float(SPATIAL["cell_degrees"])
+EARTH_RADIUS_KM = 6371.0
+
+# Latest position per device, bucketed into grid cells so region queries touch only the covering cells.
+# Shifting by 90/180 keeps the operands non-negative, so CAST truncation is floor().
+POSITION_TRIGGER = f"""
+    CREATE TRIGGER trg_telemetry_positions AFTER INSERT ON telemetry
+    BEGIN
+        INSERT INTO device_positions (device_id, ts, lat, lon, status, cell_y, cell_x)
+        VALUES (
+            NEW.device_id, NEW.ts, NEW.lat, NEW.lon, NEW.status,
+            CAST((NEW.lat + 90.0) / {CELL_DEGREES!r} AS INTEGER),
+            CAST((NEW.lon + 180.0) / {CELL_DEGREES!r} AS INTEGER)
+        )
+        ON CONFLICT (device_id) DO UPDATE SET
+            ts = excluded.ts,
+            lat = excluded.lat,
+            lon = excluded.lon,
+            status = excluded.status,
+            cell_y = excluded.cell_y,
+            cell_x = excluded.cell_x
+        WHERE excluded.ts >= device_positions.ts;
+    END
+    """
+
+_INITIALIZED: Set[str] = set()
+
+
+def _connect() -> sqlite3.Connection:
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    return sqlite3.connect(DB_PATH)
+
+
+def init_db() -> None:
+    if str(DB_PATH) in _INITIALIZED and DB_PATH.exists():
+        return
+    with _connect() as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS telemetry (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TEXT NOT NULL,
+                device_id TEXT NOT NULL,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL,
+                ph REAL NOT NULL,
+                turbidity REAL NOT NULL,
+                temperature REAL NOT NULL,
+                flow REAL NOT NULL,
+                battery REAL NOT NULL,
+                nonce TEXT NOT NULL,
+                status TEXT NOT NULL,
+                reason TEXT
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS security_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TEXT NOT NULL,
+                event_type TEXT NOT NULL,
+                device_id TEXT,
+                severity TEXT NOT NULL,
+                detail TEXT
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tls_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TEXT NOT NULL,
+                handshake_ms REAL NOT NULL,
+                cipher TEXT,
+                tls_version TEXT,
+                success INTEGER NOT NULL,
+                run_id TEXT,
+                resumed INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        tls_columns = {row[1] for row in conn.execute("PRAGMA table_info(tls_metrics)")}
+        if "run_id" not in tls_columns:
+            conn.execute("ALTER TABLE tls_metrics ADD COLUMN run_id TEXT")
+        if "resumed" not in tls_columns:
+            conn.execute("ALTER TABLE tls_metrics ADD COLUMN resumed INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_telemetry_ts ON telemetry (ts)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_telemetry_device_ts ON telemetry (device_id, ts)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_security_events_ts ON security_events (ts)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_security_events_type_ts ON security_events (event_type, ts)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tls_metrics_run_id ON tls_metrics (run_id)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS security_windows (
+                signal TEXT NOT NULL,
+                device_id TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                window_seconds REAL NOT NULL,
+                updated TEXT NOT NULL,
+                PRIMARY KEY (signal, device_id)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS device_gaps (
+                device_id TEXT NOT NULL,
+                start_ts TEXT NOT NULL,
+                end_ts TEXT,
+                seconds REAL,
+                expected_interval REAL,
+                PRIMARY KEY (device_id, start_ts)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_device_gaps_start ON device_gaps (start_ts)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS devices (
+                device_id TEXT PRIMARY KEY,
+                cert_fingerprint TEXT,
+                cert_path TEXT,
+                key_path TEXT,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL,
+                enabled INTEGER NOT NULL DEFAULT 1,
+                updated TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_devices_version ON devices (version)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS device_tombstones (
+                device_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS registry_version (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                version INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute("INSERT OR IGNORE INTO registry_version (id, version) VALUES (0, 0)")
+        for trigger in REGISTRY_TRIGGERS:
+            conn.execute(trigger)
+        counters_exist = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pipeline_counters'"
+        ).fetchone()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pipeline_counters (
+                scope TEXT NOT NULL,
+                key TEXT NOT NULL,
+                name TEXT NOT NULL,
+                value INTEGER NOT NULL,
+                PRIMARY KEY (scope, key, name)
+            ) WITHOUT ROWID
+            """
+        )
+        for trigger in COUNTER_TRIGGERS:
+            conn.execute(trigger)
+        if not counters_exist:
+            _rebuild_counters(conn)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS device_positions (
+                device_id TEXT PRIMARY KEY,
+                ts TEXT NOT NULL,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL,
+                status TEXT NOT NULL,
+                cell_y INTEGER NOT NULL,
+                cell_x INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_device_positions_cell ON device_positions (cell_y, cell_x)")
+        current = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_telemetry_positions'"
+        ).fetchone()
+        if current is None or current[0].strip() != POSITION_TRIGGER.strip():
+            # New table, or the configured cell size changed: recreate the trigger and re-bucket.
+            conn.execute("DROP TRIGGER IF EXISTS trg_telemetry_positions")
+            conn.execute(POSITION_TRIGGER)
+            _rebuild_positions(conn)
+        conn.commit()
+    _INITIALIZED.add(str(DB_PATH))
+
+
+def insert_telemetry(record: Dict[str, Any]) -> None:
+    init_db()
+    with _connect() as conn:
+        conn.execute(
+            """
+            INSERT INTO telemetry (
+                ts, device_id, lat, lon, ph, turbidity, temperature, flow, battery, nonce, status, reason
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                record["ts"],
+                record["device_id"],
+                record["lat"],
+                record["lon"],
+                record["ph"],
+                record["turbidity"],
+                record["temperature"],
+                record["flow"],
+                record["battery"],
+                record["nonce"],
+                record["status"],
+                record.get("reason"),
+            ),
+        )
+        conn.commit()
+
+
+def insert_telemetry_batch(records: Iterable[Dict[str, Any]]) -> None:
+    init_db()
+    with _connect() as conn:
+        conn.executemany(
+            """
+            INSERT INTO telemetry (
+                ts, device_id, lat, lon, ph, turbidity, temperature, flow, battery, nonce, status, reason
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    record["ts"],
+                    record["device_id"],
+                    record["lat"],
+                    record["lon"],
+                    record["ph"],
+                    record["turbidity"],
+                    record["temperature"],
+                    record["flow"],
+                    record["battery"],
+                    record["nonce"],
+                    record["status"],
+                    record.get("reason"),
+                )
+                for record in records
+            ),
+        )
+        conn.commit()
+
+
+def insert_security_event(event: Dict[str, Any]) -> None:
+    init_db()
+    with _connect() as conn:
+        conn.execute(
+            """
+            INSERT INTO security_events (ts, event_type, device_id, severity, detail)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (
+                event["ts"],
+                event["event_type"],
+                event.get("device_id"),
+                event["severity"],
+                json.dumps(event.get("detail"), ensure_ascii=False),
+            ),
+        )
+        conn.commit()
+
+
+def insert_tls_metric(metric: Dict[str, Any]) -> None:
+    insert_tls_metrics([metric])
+
+
+def insert_tls_metrics(metrics: Iterable[Dict[str, Any]]) -> None:
+    init_db()
+    with _connect() as conn:
+        conn.executemany(
+            """
+            INSERT INTO tls_metrics (ts, handshake_ms, cipher, tls_version, success, run_id, resumed)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    metric["ts"],
+                    metric["handshake_ms"],
+                    metric.get("cipher"),
+                    metric.get("tls_version"),
+                    1 if metric.get("success", True) else 0,
+                    metric.get("run_id"),
+                    1 if metric.get("resumed") else 0,
+                )
+                for metric in metrics
+            ),
+        )
+        conn.commit()
+
+
+def fetch_recent_telemetry(limit: int = 500) -> Iterable[Dict[str, Any]]:
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT ts, device_id, lat, lon, ph, turbidity, temperature, flow, battery, nonce, status, reason
+            FROM telemetry
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+    for row in rows:
+        yield {
+            "ts": row[0],
+            "device_id": row[1],
+            "lat": row[2],
+            "lon": row[3],
+            "ph": row[4],
+            "turbidity": row[5],
+            "temperature": row[6],
+            "flow": row[7],
+            "battery": row[8],
+            "nonce": row[9],
+            "status": row[10],
+            "reason": row[11],
+        }
+
+
+def fetch_security_events(limit: int = 200) -> Iterable[Dict[str, Any]]:
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT ts, event_type, device_id, severity, detail
+            FROM security_events
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+    for row in rows:
+        yield {
+            "ts": row[0],
+            "event_type": row[1],
+            "device_id": row[2],
+            "severity": row[3],
+            "detail": json.loads(row[4]) if row[4] else None,
+        }
+
+
+def fetch_tls_metrics(limit: int = 200) -> Iterable[Dict[str, Any]]:
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT ts, handshake_ms, cipher, tls_version, success, run_id, resumed
+            FROM tls_metrics
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+    for row in rows:
+        yield {
+            "ts": row[0],
+            "handshake_ms": row[1],
+            "cipher": row[2],
+            "tls_version": row[3],
+            "success": bool(row[4]),
+            "run_id": row[5],
+            "resumed": bool(row[6]),
+        }
+
+
+def fetch_last_telemetry(device_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    init_db()
+    with _connect() as conn:
+        if device_id:
+            row = conn.execute(
+                """
+                SELECT ts, device_id, lat, lon, ph, turbidity, temperature, flow, battery, nonce, status, reason
+                FROM telemetry
+                WHERE device_id = ?
+                ORDER BY id DESC
+                LIMIT 1
+                """,
+                (device_id,),
+            ).fetchone()
+        else:
+            row = conn.execute(
+                """
+                SELECT ts, device_id, lat, lon, ph, turbidity, temperature, flow, battery, nonce, status, reason
+                FROM telemetry
+                ORDER BY id DESC
+                LIMIT 1
+                """
+            ).fetchone()
+    if not row:
+        return None
+    return {
+        "ts": row[0],
+        "device_id": row[1],
+        "lat": row[2],
+        "lon": row[3],
+        "ph": row[4],
+        "turbidity": row[5],
+        "temperature": row[6],
+        "flow": row[7],
+        "battery": row[8],
+        "nonce": row[9],
+        "status": row[10],
+        "reason": row[11],
+    }
+
+
+def fetch_telemetry_downsampled(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    max_points: int = 2000,
+    metrics: Sequence[str] = ("ph", "turbidity", "temperature"),
+    device_ids: Optional[Sequence[str]] = None,
+    status: Optional[str] = None,
+) -> Iterable[Dict[str, Any]]:
+    unknown = [m for m in metrics if m not in TREND_METRICS]
+    if unknown:
+        raise ValueError(f"unsupported metrics: {unknown}")
+    buckets = max(1, max_points // (2 * max(1, len(metrics))))
+    init_db()
+    with _connect() as conn:
+        if start is None or end is None:
+            first, last = conn.execute("SELECT MIN(ts), MAX(ts) FROM telemetry").fetchone()
+            start = start or first
+            end = end or last
+        if start is None or end is None:
+            return
+        span_seconds = conn.execute("SELECT (julianday(?) - julianday(?)) * 86400.0", (end, start)).fetchone()[0]
+        if span_seconds is None:
+            raise ValueError(f"invalid time range: {start} .. {end}")
+        bucket_seconds = max(span_seconds / buckets, 1e-3)
+        where, params = _filter_clause(device_ids=device_ids, start=start, end=end, status=status)
+        # With a single MIN()/MAX() per SELECT, SQLite takes the bare ts from the row holding the extreme,
+        # so every point is plotted when it actually happened rather than at the bucket edges.
+        extremes = " UNION ALL ".join(
+            f"SELECT ?, {fn}({m}), ts FROM bucketed GROUP BY bucket" for m in metrics for fn in ("MIN", "MAX")
+        )
+        rows = conn.execute(
+            f"""
+            WITH bucketed AS (
+                SELECT MIN(CAST((julianday(ts) - julianday(?)) * 86400.0 / ? AS INTEGER), ?) AS bucket, ts,
+                    {", ".join(metrics)}
+                FROM telemetry
+                {where}
+            )
+            {extremes}
+            """,
+            (start, bucket_seconds, buckets - 1, *params, *(m for m in metrics for _ in range(2))),
+        ).fetchall()
+    seen = set()
+    for metric, value, ts in sorted(rows, key=lambda row: row[2] or ""):
+        if value is None or (metric, ts, value) in seen:
+            continue
+        seen.add((metric, ts, value))
+        yield {"ts": ts, metric: value}
+
+
+def _filter_clause(
+    device_ids: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    status: Optional[str] = None,
+    event_types: Optional[Sequence[str]] = None,
+    severities: Optional[Sequence[str]] = None,
+) -> Tuple[str, List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    for column, values in (("device_id", device_ids), ("event_type", event_types), ("severity", severities)):
+        if values:
+            clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+    if status:
+        clauses.append("status = ?")
+        params.append(status)
+    if start:
+        clauses.append("ts >= ?")
+        params.append(start)
+    if end:
+        clauses.append("ts <= ?")
+        params.append(end)
+    if not clauses:
+        return "", params
+    return "WHERE " + " AND ".join(clauses), params
+
+
+def query_telemetry(
+    device_ids: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 5000,
+) -> Iterable[Dict[str, Any]]:
+    where, params = _filter_clause(device_ids=device_ids, start=start, end=end, status=status)
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {", ".join(TELEMETRY_COLUMNS)}
+            FROM telemetry
+            {where}
+            ORDER BY ts DESC
+            LIMIT ?
+            """,
+            (*params, limit),
+        ).fetchall()
+    for row in rows:
+        yield dict(zip(TELEMETRY_COLUMNS, row))
+
+
+def query_security_events(
+    device_ids: Optional[Sequence[str]] = None,
+    event_types: Optional[Sequence[str]] = None,
+    severities: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: int = 200,
+) -> Iterable[Dict[str, Any]]:
+    where, params = _filter_clause(
+        device_ids=device_ids,
+        event_types=event_types,
+        severities=severities,
+        start=start,
+        end=end,
+    )
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT ts, event_type, device_id, severity, detail
+            FROM security_events
+            {where}
+            ORDER BY ts DESC
+            LIMIT ?
+            """,
+            (*params, limit),
+        ).fetchall()
+    for row in rows:
+        yield {
+            "ts": row[0],
+            "event_type": row[1],
+            "device_id": row[2],
+            "severity": row[3],
+            "detail": json.loads(row[4]) if row[4] else None,
+        }
+
+
+def _cell(lat: float, lon: float) -> Tuple[int, int]:
+    # Must match the trigger's CAST(x / cell AS INTEGER): floor division disagrees on exact boundaries.
+    return int((lat + 90.0) / CELL_DEGREES), int((lon + 180.0) / CELL_DEGREES)
+
+
+def fetch_positions_bbox(
+    south: float,
+    west: float,
+    north: float,
+    east: float,
+    device_ids: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    # A box with west > east crosses the antimeridian and is split in two.
+    spans = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+    device_clause = f"AND device_id IN ({', '.join('?' for _ in device_ids)})" if device_ids else ""
+    init_db()
+    rows = []
+    with _connect() as conn:
+        for low, high in spans:
+            (y0, x0), (y1, x1) = _cell(south, low), _cell(north, high)
+            rows += conn.execute(
+                f"""
+                SELECT {", ".join(POSITION_COLUMNS)}
+                FROM device_positions
+                WHERE cell_y BETWEEN ? AND ? AND cell_x BETWEEN ? AND ?
+                    AND lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?
+                    {device_clause}
+                """,
+                (y0, y1, x0, x1, south, north, low, high, *(device_ids or ())),
+            ).fetchall()
+    return [dict(zip(POSITION_COLUMNS, row)) for row in rows]
+
+
+def fetch_positions_radius(
+    lat: float,
+    lon: float,
+    radius_km: float,
+    device_ids: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    # Pre-filter on the bounding box through the cell index, then keep exact great-circle matches.
+    angle = radius_km / EARTH_RADIUS_KM
+    south, north = lat - math.degrees(angle), lat + math.degrees(angle)
+    if south <= -90.0 or north >= 90.0:
+        south, north, west, east = max(south, -90.0), min(north, 90.0), -180.0, 180.0
+    else:
+        dlon = math.degrees(math.asin(min(1.0, math.sin(angle) / math.cos(math.radians(lat)))))
+        west, east = lon - dlon, lon + dlon
+        west, east = west + 360.0 if west < -180.0 else west, east - 360.0 if east > 180.0 else east
+    matches = []
+    phi = math.radians(lat)
+    for position in fetch_positions_bbox(south, west, north, east, device_ids):
+        dphi = math.radians(position["lat"]) - phi
+        dlam = math.radians(position["lon"] - lon)
+        a = math.sin(dphi / 2) ** 2 + math.cos(phi) * math.cos(math.radians(position["lat"])) * math.sin(dlam / 2) ** 2
+        distance = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+        if distance <= radius_km:
+            position["distance_km"] = distance
+            matches.append(position)
+    return sorted(matches, key=lambda position: position["distance_km"])
+
+
+def query_device_positions(
+    device_ids: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 5000,
+) -> Iterable[Dict[str, Any]]:
+    where, params = _filter_clause(device_ids=device_ids, start=start, end=end, status=status)
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT {', '.join(POSITION_COLUMNS)} FROM device_positions {where} LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+    for row in rows:
+        yield dict(zip(POSITION_COLUMNS, row))
+
+
+def query_position_cells(
+    device_ids: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    status: Optional[str] = None,
+    merge: int = 1,
+) -> Iterable[Dict[str, Any]]:
+    # merge > 1 groups merge x merge blocks of cells into one, for coarser map zoom levels.
+    where, params = _filter_clause(device_ids=device_ids, start=start, end=end, status=status)
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT cell_y / ?, cell_x / ?, COUNT(*), AVG(lat), AVG(lon), SUM(status = 'anomaly'), MAX(ts)
+            FROM device_positions
+            {where}
+            GROUP BY 1, 2
+            """,
+            (merge, merge, *params),
+        ).fetchall()
+    for row in rows:
+        yield {
+            "cell_y": row[0],
+            "cell_x": row[1],
+            "devices": row[2],
+            "lat": row[3],
+            "lon": row[4],
+            "anomalies": row[5],
+            "ts": row[6],
+        }
+
+
+def _export_queries(
+    table: str,
+    device_ids: Optional[Sequence[str]],
+    start: Optional[str],
+    end: Optional[str],
+) -> Tuple[str, str, List[Any]]:
+    columns = EXPORT_COLUMNS[table]
+    where, params = _filter_clause(device_ids=device_ids, start=start, end=end)
+    after = f"{'AND' if where else 'WHERE'} (ts, id) > (?, ?)"
+    sql = f"SELECT id, {', '.join(columns)} FROM {table} {where} {{after}} ORDER BY ts, id LIMIT ?"
+    return sql.format(after=""), sql.format(after=after), params
+
+
+def _export_partitions(table: str, device_ids: Optional[Sequence[str]]) -> List[Optional[List[str]]]:
+    # With several devices the (device_id, ts) index can only serve one device in ts order; an IN list
+    # sorts the whole match in a temp B-tree on every page. Each device gets its own cursor instead.
+    if table == "telemetry" and device_ids and len(set(device_ids)) > 1:
+        return [[device_id] for device_id in sorted(set(device_ids))]
+    return [list(device_ids) if device_ids else None]
+
+
+def _iter_keyset(
+    conn: sqlite3.Connection,
+    table: str,
+    device_ids: Optional[Sequence[str]],
+    start: Optional[str],
+    end: Optional[str],
+    page_size: int,
+) -> Iterator[Tuple[Any, ...]]:
+    first, rest, params = _export_queries(table, device_ids, start, end)
+    ts_index = EXPORT_COLUMNS[table].index("ts") + 1
+    rows = conn.execute(first, (*params, page_size)).fetchall()
+    while rows:
+        yield from rows
+        if len(rows) < page_size:
+            break
+        last = rows[-1]
+        rows = conn.execute(rest, (*params, last[ts_index], last[0], page_size)).fetchall()
+
+
+def explain_export(
+    table: str,
+    device_ids: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> List[str]:
+    # Plan lines for every statement an export runs; none should sort in a temp B-tree.
+    init_db()
+    details = []
+    with _connect() as conn:
+        for partition in _export_partitions(table, device_ids):
+            first, rest, params = _export_queries(table, partition, start, end)
+            for sql, extra in ((first, (1,)), (rest, ("", 0, 1))):
+                plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", (*params, *extra)).fetchall()
+                details.extend(row[-1] for row in plan)
+    return details
+
+
+def iter_export_chunks(
+    table: str,
+    device_ids: Optional[Sequence[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    chunk_size: int = 5000,
+) -> Iterator[List[Tuple[Any, ...]]]:
+    # Keyset pagination on (ts, id) so every page is an index range seek, whatever the offset. Per-device
+    # cursors are merged on (ts, id), which keeps the output in the same order as a single cursor.
+    partitions = _export_partitions(table, device_ids)
+    ts_index = EXPORT_COLUMNS[table].index("ts") + 1
+    page_size = max(256, chunk_size // len(partitions)) if len(partitions) > 1 else chunk_size
+    init_db()
+    conn = _connect()
+    try:
+        cursors = [_iter_keyset(conn, table, partition, start, end, page_size) for partition in partitions]
+        rows = cursors[0] if len(cursors) == 1 else heapq.merge(*cursors, key=lambda row: (row[ts_index], row[0]))
+        chunk = []
+        for row in rows:
+            chunk.append(row[1:])
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        conn.close()
+
+
+def fetch_device_ids() -> List[str]:
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute(
+            """
+            WITH RECURSIVE devices(device_id) AS (
+                SELECT MIN(device_id) FROM telemetry
+                UNION ALL
+                SELECT (SELECT MIN(device_id) FROM telemetry WHERE device_id > devices.device_id)
+                FROM devices
+                WHERE devices.device_id IS NOT NULL
+            )
+            SELECT device_id FROM devices WHERE device_id IS NOT NULL
+            """
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def _counters_from_raw(conn: sqlite3.Connection) -> Dict[Tuple[str, str, str], int]:
+    counters: Dict[Tuple[str, str, str], int] = {}
+    totals = {"messages": 0, "anomalies": 0, "devices": 0}
+    for device_id, messages, anomalies in conn.execute(
+        "SELECT device_id, COUNT(*), SUM(status = 'anomaly') FROM telemetry GROUP BY device_id"
+    ):
+        counters[("device", device_id, "messages")] = messages
+        if anomalies:
+            counters[("device", device_id, "anomalies")] = anomalies
+        totals["messages"] += messages
+        totals["anomalies"] += anomalies
+        totals["devices"] += 1
+    for event_type, events in conn.execute("SELECT event_type, COUNT(*) FROM security_events GROUP BY event_type"):
+        counters[("event_type", event_type, "events")] = events
+    attempts, handshakes = conn.execute("SELECT COUNT(*), COALESCE(SUM(success != 0), 0) FROM tls_metrics").fetchone()
+    totals["tls_attempts"] = attempts
+    totals["tls_handshakes"] = handshakes
+    for name, value in totals.items():
+        if value:
+            counters[("total", "", name)] = value
+    return counters
+
+
+def _rebuild_counters(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM pipeline_counters")
+    conn.executemany(
+        "INSERT INTO pipeline_counters (scope, key, name, value) VALUES (?, ?, ?, ?)",
+        ((scope, key, name, value) for (scope, key, name), value in _counters_from_raw(conn).items()),
+    )
+
+
+def _rebuild_positions(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM device_positions")
+    # SQLite fills the bare columns from the row holding MAX(ts), one pass over idx_telemetry_device_ts.
+    conn.execute(
+        f"""
+        INSERT INTO device_positions (device_id, ts, lat, lon, status, cell_y, cell_x)
+        SELECT device_id, MAX(ts), lat, lon, status,
+            CAST((lat + 90.0) / {CELL_DEGREES!r} AS INTEGER),
+            CAST((lon + 180.0) / {CELL_DEGREES!r} AS INTEGER)
+        FROM telemetry
+        GROUP BY device_id
+        """
+    )
+
+
+def check_counters(repair: bool = False) -> List[Dict[str, Any]]:
+    init_db()
+    with _connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        stored = {
+            (scope, key, name): value
+            for scope, key, name, value in conn.execute("SELECT scope, key, name, value FROM pipeline_counters")
+        }
+        expected = _counters_from_raw(conn)
+        mismatches: List[Dict[str, Any]] = []
+        for scope, key, name in sorted(set(stored) | set(expected)):
+            have = stored.get((scope, key, name), 0)
+            want = expected.get((scope, key, name), 0)
+            if have != want:
+                mismatches.append({"scope": scope, "key": key, "name": name, "stored": have, "expected": want})
+        if repair and mismatches:
+            _rebuild_counters(conn)
+        conn.commit()
+    return mismatches
+
+
+def fetch_kpis() -> Dict[str, int]:
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT scope, key, name, value
+            FROM pipeline_counters
+            WHERE scope = 'total' OR (scope = 'event_type' AND key = 'replay_detected')
+            """
+        ).fetchall()
+    values = {(scope, key, name): value for scope, key, name, value in rows}
+    return {
+        "total_messages": values.get(("total", "", "messages"), 0),
+        "active_devices": values.get(("total", "", "devices"), 0),
+        "anomalies": values.get(("total", "", "anomalies"), 0),
+        "replay_attempts": values.get(("event_type", "replay_detected", "events"), 0),
+        "tls_handshakes": values.get(("total", "", "tls_handshakes"), 0),
+    }
+
+
+def replace_security_windows(rows: Iterable[Dict[str, Any]], updated: str) -> None:
+    init_db()
+    with _connect() as conn:
+        conn.execute("DELETE FROM security_windows")
+        conn.executemany(
+            """
+            INSERT INTO security_windows (signal, device_id, count, window_seconds, updated)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            ((row["signal"], row["device_id"], row["count"], row["window_seconds"], updated) for row in rows),
+        )
+        conn.commit()
+
+
+def fetch_security_windows(limit: int = 50) -> Iterable[Dict[str, Any]]:
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT signal, device_id, count, window_seconds, updated
+            FROM security_windows
+            ORDER BY count DESC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+    for row in rows:
+        yield {
+            "signal": row[0],
+            "device_id": row[1],
+            "count": row[2],
+            "window_seconds": row[3],
+            "updated": row[4],
+        }
+
+
+def open_gap(device_id: str, start: str, expected_interval: Optional[float] = None) -> None:
+    init_db()
+    with _connect() as conn:
+        conn.execute(
+            """
+            INSERT INTO device_gaps (device_id, start_ts, expected_interval) VALUES (?, ?, ?)
+            ON CONFLICT (device_id, start_ts) DO NOTHING
+            """,
+            (device_id, start, expected_interval),
+        )
+        conn.commit()
+
+
+def close_gap(
+    device_id: str,
+    start: str,
+    end: str,
+    seconds: float,
+    expected_interval: Optional[float] = None,
+) -> None:
+    init_db()
+    with _connect() as conn:
+        cursor = conn.execute(
+            """
+            UPDATE device_gaps
+            SET end_ts = ?, seconds = (julianday(?) - julianday(start_ts)) * 86400.0
+            WHERE device_id = ? AND end_ts IS NULL
+            """,
+            (end, end, device_id),
+        )
+        if cursor.rowcount == 0:
+            # Late report that beat the silence poll: the gap was never opened.
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO device_gaps (device_id, start_ts, end_ts, seconds, expected_interval)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (device_id, start, end, seconds, expected_interval),
+            )
+        conn.commit()
+
+
+def fetch_open_gaps() -> Dict[str, str]:
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute("SELECT device_id, MAX(start_ts) FROM device_gaps WHERE end_ts IS NULL GROUP BY device_id")
+        return dict(rows.fetchall())
+
+
+def fetch_gaps(
+    min_seconds: float = 0.0,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    device_ids: Optional[Sequence[str]] = None,
+    now: Optional[str] = None,
+    limit: int = 1000,
+) -> Iterable[Dict[str, Any]]:
+    # Gaps overlapping [start, end] lasting at least min_seconds; open gaps are measured up to `now`.
+    clauses = ["COALESCE(seconds, (julianday(COALESCE(?, 'now')) - julianday(start_ts)) * 86400.0) >= ?"]
+    params: List[Any] = [now, min_seconds]
+    if device_ids:
+        clauses.append(f"device_id IN ({', '.join('?' for _ in device_ids)})")
+        params.extend(device_ids)
+    if end:
+        clauses.append("start_ts <= ?")
+        params.append(end)
+    if start:
+        clauses.append("(end_ts IS NULL OR end_ts >= ?)")
+        params.append(start)
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT device_id, start_ts, end_ts,
+                COALESCE(seconds, (julianday(COALESCE(?, 'now')) - julianday(start_ts)) * 86400.0),
+                expected_interval
+            FROM device_gaps
+            WHERE {" AND ".join(clauses)}
+            ORDER BY start_ts DESC
+            LIMIT ?
+            """,
+            (now, *params, limit),
+        ).fetchall()
+    for row in rows:
+        yield {
+            "device_id": row[0],
+            "start": row[1],
+            "end": row[2],
+            "seconds": row[3],
+            "expected_interval": row[4],
+        }
+
+
+def upsert_devices(devices: Iterable[Dict[str, Any]], updated: str) -> None:
+    # "enabled" is applied to existing rows only when the caller sets it, so re-seeding from certs
+    # does not re-enable devices that were disabled on purpose.
+    init_db()
+    with _connect() as conn:
+        conn.executemany(
+            """
+            INSERT INTO devices (device_id, cert_fingerprint, cert_path, key_path, lat, lon, enabled, updated)
+            VALUES (?1, ?2, ?3, ?4, ?5, ?6, COALESCE(?7, 1), ?8)
+            ON CONFLICT (device_id) DO UPDATE SET
+                cert_fingerprint = excluded.cert_fingerprint,
+                cert_path = excluded.cert_path,
+                key_path = excluded.key_path,
+                lat = excluded.lat,
+                lon = excluded.lon,
+                enabled = COALESCE(?7, enabled),
+                updated = excluded.updated
+            """,
+            (
+                (
+                    device["device_id"],
+                    device.get("cert_fingerprint"),
+                    device.get("cert_path"),
+                    device.get("key_path"),
+                    device["lat"],
+                    device["lon"],
+                    None if device.get("enabled") is None else int(bool(device["enabled"])),
+                    updated,
+                )
+                for device in devices
+            ),
+        )
+        conn.commit()
+
+
+def set_devices_enabled(device_ids: Sequence[str], enabled: bool, updated: str) -> int:
+    init_db()
+    with _connect() as conn:
+        cursor = conn.executemany(
+            "UPDATE devices SET enabled = ?, updated = ? WHERE device_id = ? AND enabled != ?",
+            ((1 if enabled else 0, updated, device_id, 1 if enabled else 0) for device_id in device_ids),
+        )
+        conn.commit()
+    return cursor.rowcount
+
+
+def delete_devices(device_ids: Sequence[str]) -> int:
+    init_db()
+    with _connect() as conn:
+        cursor = conn.executemany("DELETE FROM devices WHERE device_id = ?", ((device_id,) for device_id in device_ids))
+        conn.commit()
+    return cursor.rowcount
+
+
+def fetch_devices(enabled_only: bool = False, since_version: Optional[int] = None) -> Iterable[Dict[str, Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    if enabled_only:
+        clauses.append("enabled = 1")
+    if since_version is not None:
+        clauses.append("version > ?")
+        params.append(since_version)
+    where = "WHERE " + " AND ".join(clauses) if clauses else ""
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {", ".join(DEVICE_COLUMNS)}
+            FROM devices
+            {where}
+            ORDER BY {"version" if since_version is not None else "device_id"}
+            """,
+            params,
+        ).fetchall()
+    for row in rows:
+        device = dict(zip(DEVICE_COLUMNS, row))
+        device["enabled"] = bool(device["enabled"])
+        yield device
+
+
+def fetch_removed_devices(since_version: int) -> List[str]:
+    init_db()
+    with _connect() as conn:
+        rows = conn.execute("SELECT device_id FROM device_tombstones WHERE version > ?", (since_version,)).fetchall()
+    return [row[0] for row in rows]
+
+
+def fetch_registry_version() -> int:
+    init_db()
+    with _connect() as conn:
+        return conn.execute("SELECT version FROM registry_version WHERE id = 0").fetchone()[0]
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+from hydroficient.pipeline import storage
+from hydroficient.pipeline.auth import sign_payload
+from hydroficient.pipeline.config import MQTT, SECURITY
+from hydroficient.pipeline.correlator import SecurityCorrelator
+from hydroficient.pipeline.ingest_service import IngestService, NonceCache
+from hydroficient.pipeline.mqtt_client import build_client
+from hydroficient.simulator.device_simulator import generate_payload, registry
+
+KINDS = ("legit", "replay", "stale", "unauthorized", "forged", "malformed")
+
+EXPECTED_EVENT = {
+    "replay": "replay_detected",
+    "stale": "stale_message",
+    "unauthorized": "unauthorized_device",
+    "forged": "invalid_signature",
+    "malformed": "invalid_payload",
+}
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def _percentile(values: List[float], pct: int) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+class TrafficGenerator:
+    def __init__(self, mix: Dict[str, float], history: int) -> None:
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.devices = [device.device_id for device in registry.enabled_devices()]
+        self.history: Deque[Tuple[int, bytes]] = deque(maxlen=history)
+
+    def remember(self, raw: bytes, nonce_seq: int) -> None:
+        self.history.append((nonce_seq, raw))
+
+    def next_message(self) -> Tuple[str, bytes, Optional[int]]:
+        kind = random.choices(self.kinds, self.weights)[0]
+        if kind == "replay" and not self.history:
+            kind = "legit"
+        if kind == "replay":
+            seq, raw = random.choice(self.history)
+            return kind, raw, seq
+        if kind == "malformed":
+            return kind, random.choice([b"{not json", b"", b"\xff\xfe", b'{"device_id": ']), None
+
+        payload = generate_payload(random.choice(self.devices), 0.0)
+        if kind == "stale":
+            skew = SECURITY["max_skew_seconds"] * random.uniform(2, 10)
+            payload["ts"] = _iso(datetime.now(timezone.utc) - timedelta(seconds=skew))
+            sign_payload(payload)
+        elif kind == "unauthorized":
+            payload["device_id"] = f"intruder_{uuid.uuid4().hex[:6]}"
+            sign_payload(payload)
+        elif kind == "forged":
+            # Claims a registered device but carries a signature made with someone else's key; with a
+            # single registered device the signer is a fabricated id.
+            claimed = signer = payload["device_id"]
+            if len(self.devices) > 1:
+                while signer == claimed:
+                    signer = random.choice(self.devices)
+            else:
+                signer = f"forger_{uuid.uuid4().hex[:6]}"
+            payload["device_id"] = signer
+            sign_payload(payload)
+            payload["device_id"] = claimed
+        return kind, json.dumps(payload).encode("utf-8"), None
+
+
+class InstrumentedIngestService(IngestService):
+    def __init__(self) -> None:
+        super().__init__()
+        self.events: List[str] = []
+
+    def record_security_event(self, event: Dict) -> None:
+        self.events.append(event["event_type"])
+        super().record_security_event(event)
+
+
+def run_phase(rate: float, duration: float, mix: Dict[str, float], cache_size: int, history: int) -> Dict:
+    service = InstrumentedIngestService()
+    service.nonce_cache = NonceCache(cache_size)
+    generator = TrafficGenerator(mix, history)
+    sent: Counter = Counter()
+    detected: Counter = Counter()
+    latencies: Dict[str, List[float]] = {kind: [] for kind in KINDS}
+    replay_by_fill: Dict[int, List[int]] = {}
+    replay_by_age: Dict[str, List[int]] = {"within_cache": [0, 0], "beyond_cache": [0, 0]}
+    busy = 0.0
+    nonces_added = 0
+
+    start = time.perf_counter()
+    deadline = start + duration
+    index = 0
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        if rate > 0:
+            due = start + index / rate
+            if due > now:
+                time.sleep(due - now)
+        kind, raw, replayed_seq = generator.next_message()
+        fill = len(service.nonce_cache.cache) / cache_size
+        age = nonces_added - replayed_seq if replayed_seq is not None else None
+        before = len(service.events)
+        t0 = time.perf_counter()
+        outcome = service.process(raw)
+        elapsed = time.perf_counter() - t0
+        busy += elapsed
+        index += 1
+        if outcome in ("ok", "anomaly"):
+            if kind == "legit":
+                generator.remember(raw, nonces_added)
+            nonces_added += 1
+
+        sent[kind] += 1
+        latencies[kind].append(elapsed * 1e6)
+        expected = EXPECTED_EVENT.get(kind)
+        hit = expected is not None and expected in service.events[before:]
+        if hit:
+            detected[kind] += 1
+        del service.events[:]
+        if kind == "replay":
+            bucket = replay_by_fill.setdefault(min(9, int(fill * 10)), [0, 0])
+            bucket[0] += 1
+            bucket[1] += 0 if hit else 1
+            age_bucket = replay_by_age["within_cache" if age is not None and age <= cache_size else "beyond_cache"]
+            age_bucket[0] += 1
+            age_bucket[1] += 0 if hit else 1
+
+    wall = time.perf_counter() - start
+    return {
+        "rate": rate,
+        "wall": wall,
+        "busy": busy,
+        "sent": sent,
+        "detected": detected,
+        "latencies": latencies,
+        "replay_by_fill": replay_by_fill,
+        "replay_by_age": replay_by_age,
+    }
+
+
+def _report(label: str, result: Dict) -> None:
+    sent, detected, latencies = result["sent"], result["detected"], result["latencies"]
+    total = sum(sent.values())
+    target = f"{result['rate']:.0f}" if result["rate"] > 0 else "max"
+    achieved = total / result["wall"] if result["wall"] > 0 else 0.0
+    legit_rate = sent["legit"] / result["wall"] if result["wall"] > 0 else 0.0
+    print(
+        f"[attack] {label}: target={target} msg/s achieved={achieved:.0f} msg/s "
+        f"legit={legit_rate:.0f} msg/s utilisation={result['busy'] / result['wall'] * 100:.0f}%"
+    )
+    legit = sorted(latencies["legit"])
+    print(f"[attack]   legit latency p50={_percentile(legit, 50):.0f}us p99={_percentile(legit, 99):.0f}us")
+    for kind in KINDS[1:]:
+        if not sent[kind]:
+            continue
+        values = sorted(latencies[kind])
+        missed = sent[kind] - detected[kind]
+        print(
+            f"[attack]   {kind:<12} sent={sent[kind]:>7} missed={missed:>6} "
+            f"({missed / sent[kind] * 100:5.1f}%) detect p50={_percentile(values, 50):.0f}us "
+            f"p99={_percentile(values, 99):.0f}us"
+        )
+    if result["replay_by_fill"]:
+        cells = " ".join(
+            f"{decile * 10}%:{misses / count * 100:.0f}%"
+            for decile, (count, misses) in sorted(result["replay_by_fill"].items())
+        )
+        print(f"[attack]   replay false negatives by nonce-store fill: {cells}")
+        cells = " ".join(
+            f"{name}:{misses}/{count}" for name, (count, misses) in result["replay_by_age"].items() if count
+        )
+        print(f"[attack]   replay false negatives by nonce age: {cells}")
+
+
+def _check_correlator_bounds(max_keys: int = 100) -> None:
+    # Unauthorized floods invent a scope per message; both the counters and the escalation
+    # timestamps must stay within the key cap however many scopes go past.
+    rules = {"burst": {"signal": "probe", "scope": "device", "threshold": 1, "window_seconds": 10, "severity": "low"}}
+    correlator = SecurityCorrelator(rules, max_keys=max_keys)
+    for i in range(10 * max_keys):
+        correlator.observe(f"scope_{i}", "probe", now=float(i))
+    sizes = len(correlator.counters), len(correlator.last_escalation)
+    if max(sizes) > max_keys:
+        raise SystemExit(f"[attack] correlator state unbounded: counters={sizes[0]} escalations={sizes[1]}")
+
+
+def flood_broker(rate: float, duration: float, mix: Dict[str, float], device: str) -> None:
+    cert_path, key_path = registry.get(device).cert_files()
+    client = build_client(f"attack-harness-{uuid.uuid4().hex[:6]}", cert_path, key_path)
+    client.connect(MQTT["host"], MQTT["port"], keepalive=60)
+    client.loop_start()
+    generator = TrafficGenerator(mix, history=100_000)
+    sent: Counter = Counter()
+    start = time.perf_counter()
+    index = 0
+    try:
+        while time.perf_counter() - start < duration:
+            if rate > 0:
+                delay = start + index / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            kind, raw, _ = generator.next_message()
+            client.publish(MQTT["topic"], raw, qos=0)
+            sent[kind] += 1
+            index += 1
+    finally:
+        client.loop_stop()
+        client.disconnect()
+    elapsed = time.perf_counter() - start
+    print(f"[attack] published {index} messages in {elapsed:.2f}s ({index / elapsed:.0f} msg/s): {dict(sent)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sustained replay/fuzz flood against the ingest defense path")
+    parser.add_argument("--rates", type=float, nargs="+", default=[0.0], help="msg/s per phase, 0 for unpaced")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per phase")
+    parser.add_argument("--legit", type=float, default=0.5)
+    parser.add_argument("--replay", type=float, default=0.2)
+    parser.add_argument("--stale", type=float, default=0.1)
+    parser.add_argument("--unauthorized", type=float, default=0.1)
+    parser.add_argument("--forged", type=float, default=0.0, help="payloads claiming another device's id")
+    parser.add_argument("--malformed", type=float, default=0.1)
+    parser.add_argument("--nonce-cache-size", type=int, default=SECURITY["nonce_cache_size"])
+    parser.add_argument("--history", type=int, help="legit messages kept for replay (default: 4x nonce cache)")
+    parser.add_argument("--db", help="database file for in-process runs (default: a temporary file)")
+    parser.add_argument("--mqtt", action="store_true", help="flood the broker instead of an in-process IngestService")
+    parser.add_argument("--device", default="device_001", help="registered device whose certificate --mqtt uses")
+    args = parser.parse_args()
+
+    mix = {kind: getattr(args, kind) for kind in KINDS if getattr(args, kind) > 0}
+    if "legit" not in mix:
+        parser.error("--legit must be > 0; replays are drawn from legitimate traffic")
+    history = args.history or 4 * args.nonce_cache_size
+
+    if args.mqtt:
+        device = registry.get(args.device)
+        if device is None or device.cert_files() is None:
+            parser.error(f"{args.device} is not a registered device with a certificate")
+        for rate in args.rates:
+            flood_broker(rate, args.duration, mix, args.device)
+        return
+
+    storage.DB_PATH = Path(args.db) if args.db else Path(tempfile.mkdtemp()) / "attack_harness.db"
+    storage.init_db()
+    _check_correlator_bounds()
+    print(f"[attack] db={storage.DB_PATH} nonce_cache={args.nonce_cache_size} mix={mix}")
+    for rate in args.rates:
+        baseline = run_phase(rate, args.duration, {"legit": 1.0}, args.nonce_cache_size, history)
+        _report("baseline", baseline)
+        attacked = run_phase(rate, args.duration, mix, args.nonce_cache_size, history)
+        _report("under attack", attacked)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,30 +2,41 @@ from __future__ import annotations
 
 import argparse
 import json
-import sys
 from datetime import datetime, timezone
-from pathlib import Path
+from typing import Any, Dict, Optional
 
 import paho.mqtt.client as mqtt
 
-SRC_DIR = Path(__file__).resolve().parents[1]
-if str(SRC_DIR) not in sys.path:
-    sys.path.append(str(SRC_DIR))
-
-from pipeline.config import CERTS_DIR, MQTT
-from pipeline.storage import fetch_last_telemetry
+from hydroficient.pipeline.auth import sign_payload
+from hydroficient.pipeline.config import CERTS_DIR, MQTT
+from hydroficient.pipeline.storage import fetch_last_telemetry
 
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
 
+def _last_reading(device_id: str) -> Optional[Dict[str, Any]]:
+    # The ingestor keeps recent readings in shared memory; fall back to SQLite when it is not running.
+    from hydroficient.pipeline.ringbuffer import RingBufferReader
+
+    reader = RingBufferReader.attach()
+    if reader is not None:
+        try:
+            last = reader.latest(device_id)
+        finally:
+            reader.close()
+        if last:
+            return last
+    return fetch_last_telemetry(device_id)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Simulate an MQTT replay attack")
     parser.add_argument("--device", default="device_001")
     args = parser.parse_args()
 
-    last = fetch_last_telemetry(args.device)
+    last = _last_reading(args.device)
     if not last:
         print("[replay] no telemetry found to replay")
         return
@@ -42,6 +53,8 @@ def main() -> None:
         "battery": last["battery"],
         "nonce": last["nonce"],
     }
+    # Stored rows carry no signature, so re-sign to exercise the nonce check rather than the HMAC check.
+    sign_payload(payload)
 
     client = mqtt.Client(client_id="replay-attacker", protocol=mqtt.MQTTv311)
     client.tls_set(
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import argparse
+import socket
+import ssl
+import statistics
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from hydroficient.pipeline.config import CERTS_DIR, MQTT
+from hydroficient.pipeline.storage import insert_tls_metrics, init_db
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def build_client_context() -> ssl.SSLContext:
+    context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH, cafile=str(CERTS_DIR / "ca.crt"))
+    context.load_cert_chain(
+        certfile=str(CERTS_DIR / "pipeline_client.crt"),
+        keyfile=str(CERTS_DIR / "pipeline_client.key"),
+    )
+    return context
+
+
+def _collect_session(ssock: ssl.SSLSocket) -> None:
+    # TLS 1.3 tickets arrive after the handshake; one round trip makes the client process them.
+    ssock.settimeout(0.2)
+    try:
+        ssock.sendall(b"\x00")
+        ssock.recv(1)
+    except (socket.timeout, ssl.SSLError, OSError):
+        pass
+
+
+def run_once(
+    host: str,
+    port: int,
+    context: Optional[ssl.SSLContext] = None,
+    session: Optional[ssl.SSLSession] = None,
+    collect_session: bool = False,
+) -> dict:
+    context = context or build_client_context()
+    start = time.perf_counter()
+    try:
+        with socket.create_connection((host, port), timeout=5) as sock:
+            with context.wrap_socket(sock, server_hostname=host, session=session) as ssock:
+                handshake_ms = (time.perf_counter() - start) * 1000.0
+                cipher = ssock.cipher()[0] if ssock.cipher() else None
+                tls_version = ssock.version()
+                resumed = ssock.session_reused
+                collected = time.perf_counter()
+                if collect_session:
+                    _collect_session(ssock)
+                return {
+                    "ts": _now_iso(),
+                    "handshake_ms": handshake_ms,
+                    "cipher": cipher,
+                    "tls_version": tls_version,
+                    "success": True,
+                    "resumed": resumed,
+                    "session": ssock.session,
+                    "collect_s": time.perf_counter() - collected,
+                }
+    except Exception as exc:
+        handshake_ms = (time.perf_counter() - start) * 1000.0
+        return {
+            "ts": _now_iso(),
+            "handshake_ms": handshake_ms,
+            "cipher": None,
+            "tls_version": None,
+            "success": False,
+            "resumed": False,
+            "error": str(exc),
+        }
+
+
+def run_load(
+    host: str,
+    port: int,
+    concurrency: int,
+    duration: float,
+    resume: bool,
+    run_id: str,
+) -> List[Dict]:
+    from concurrent.futures import ThreadPoolExecutor
+
+    context = build_client_context()
+    deadline = time.perf_counter() + duration
+    results: List[Dict] = []
+    lock = threading.Lock()
+
+    def worker() -> None:
+        session = None
+        local: List[Dict] = []
+        # Fetching a ticket costs an extra round trip; it is only done when a new session is needed and
+        # the time is given back to the worker so both modes get the same handshake window.
+        end = deadline
+        while time.perf_counter() < end:
+            collect = resume and session is None
+            metric = run_once(host, port, context, session, collect_session=collect)
+            end += metric.pop("collect_s", 0.0)
+            if resume and metric["success"] and not metric["resumed"]:
+                session = metric.get("session") if collect else None
+            metric.pop("session", None)
+            metric["run_id"] = run_id
+            local.append(metric)
+        with lock:
+            results.extend(local)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker) for _ in range(concurrency)]
+        for future in futures:
+            future.result()
+    return results
+
+
+def summarize(metrics: List[Dict], duration: float) -> Dict:
+    ok = sorted(m["handshake_ms"] for m in metrics if m["success"])
+    summary = {
+        "handshakes": len(ok),
+        "failures": len(metrics) - len(ok),
+        "resumed": sum(1 for m in metrics if m.get("resumed")),
+        "rate": len(ok) / duration if duration > 0 else 0.0,
+        "p50": 0.0,
+        "p95": 0.0,
+        "p99": 0.0,
+    }
+    if len(ok) >= 2:
+        cuts = statistics.quantiles(ok, n=100, method="inclusive")
+        summary.update(p50=cuts[49], p95=cuts[94], p99=cuts[98])
+    elif ok:
+        summary.update(p50=ok[0], p95=ok[0], p99=ok[0])
+    return summary
+
+
+def _print_summary(label: str, summary: Dict) -> None:
+    print(
+        f"[tls] {label:<8} {summary['handshakes']:>7} ok {summary['failures']:>5} fail "
+        f"{summary['resumed']:>7} resumed {summary['rate']:>9.1f} hs/s "
+        f"p50={summary['p50']:.2f}ms p95={summary['p95']:.2f}ms p99={summary['p99']:.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="TLS benchmark for MQTT broker")
+    parser.add_argument("--iterations", type=int, default=25)
+    parser.add_argument("--host", default=MQTT["host"])
+    parser.add_argument("--port", type=int, default=MQTT["port"])
+    parser.add_argument("--concurrency", type=int, default=0, help="run a load test with this many parallel clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per load-test phase")
+    parser.add_argument(
+        "--resumption",
+        choices=["off", "on", "compare"],
+        default="compare",
+        help="load test with full handshakes, resumed sessions, or both",
+    )
+    parser.add_argument("--local-server", action="store_true", help="benchmark an in-process TLS echo server")
+    args = parser.parse_args()
+
+    init_db()
+    server = None
+    if args.local_server:
+        from hydroficient.security.tls_echo_server import start_in_thread
+
+        server = start_in_thread(args.host)
+        args.port = server.server_address[1]
+        print(f"[tls] local echo server on {args.host}:{args.port}")
+
+    try:
+        if args.concurrency <= 0:
+            context = build_client_context()
+            run_id = uuid.uuid4().hex[:12]
+            metrics = []
+            for _ in range(args.iterations):
+                metric = run_once(args.host, args.port, context)
+                metric.pop("session", None)
+                metric["run_id"] = run_id
+                metrics.append(metric)
+                status = "ok" if metric.get("success") else "fail"
+                print(f"[tls] {status} {metric['handshake_ms']:.2f}ms")
+            insert_tls_metrics(metrics)
+            return
+
+        phases = {"off": [False], "on": [True], "compare": [False, True]}[args.resumption]
+        for resume in phases:
+            run_id = uuid.uuid4().hex[:12]
+            metrics = run_load(args.host, args.port, args.concurrency, args.duration, resume, run_id)
+            insert_tls_metrics(metrics)
+            label = "resumed" if resume else "full"
+            _print_summary(label, summarize(metrics, args.duration))
+            print(f"[tls] run_id={run_id} concurrency={args.concurrency} duration={args.duration}s")
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import socketserver
+import ssl
+import threading
+from typing import Tuple
+
+from hydroficient.pipeline.config import CERTS_DIR
+
+
+def build_server_context(require_client_cert: bool = True) -> ssl.SSLContext:
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH, cafile=str(CERTS_DIR / "ca.crt"))
+    context.load_cert_chain(
+        certfile=str(CERTS_DIR / "server.crt"),
+        keyfile=str(CERTS_DIR / "server.key"),
+    )
+    context.verify_mode = ssl.CERT_REQUIRED if require_client_cert else ssl.CERT_NONE
+    return context
+
+
+class _EchoHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        try:
+            with self.server.context.wrap_socket(self.request, server_side=True) as ssock:
+                while True:
+                    data = ssock.recv(4096)
+                    if not data:
+                        break
+                    ssock.sendall(data)
+        except (ssl.SSLError, OSError):
+            pass
+
+
+class TLSEchoServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+    def __init__(self, address: Tuple[str, int], context: ssl.SSLContext) -> None:
+        self.context = context
+        super().__init__(address, _EchoHandler)
+
+
+def start_in_thread(host: str = "localhost", port: int = 0, require_client_cert: bool = True) -> TLSEchoServer:
+    server = TLSEchoServer((host, port), build_server_context(require_client_cert))
+    threading.Thread(target=server.serve_forever, name="tls-echo-server", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local TLS echo server using the certs/ material")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8883)
+    parser.add_argument("--no-client-cert", action="store_true", help="accept clients without a certificate")
+    args = parser.parse_args()
+
+    server = TLSEchoServer((args.host, args.port), build_server_context(not args.no_client_cert))
+    print(f"[tls-echo] listening on {args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[tls-echo] stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
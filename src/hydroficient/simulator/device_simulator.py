@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from hydroficient.pipeline.auth import sign_payload
+from hydroficient.pipeline.config import MQTT, REGISTRY
+from hydroficient.pipeline.registry import Device, DeviceRegistry
+from hydroficient.simulator.trace import TraceRecorder, merge_traces, replay_trace
+
+if TYPE_CHECKING:
+    import paho.mqtt.client as mqtt
+
+registry = DeviceRegistry()
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def generate_payload(device_id: str, anomaly_rate: float) -> dict:
+    device = registry.get(device_id)
+    base_lat, base_lon = device.home if device else REGISTRY["default_location"]
+    lat = base_lat + random.uniform(-0.01, 0.01)
+    lon = base_lon + random.uniform(-0.01, 0.01)
+
+    ph = random.uniform(6.5, 8.5)
+    turbidity = random.uniform(1.0, 50.0)
+    temperature = random.uniform(10.0, 28.0)
+    flow = random.uniform(10.0, 120.0)
+    battery = random.uniform(40.0, 100.0)
+
+    if random.random() < anomaly_rate:
+        ph = random.uniform(0.5, 14.0)
+        turbidity = random.uniform(200.0, 1200.0)
+
+    payload = {
+        "ts": _now_iso(),
+        "device_id": device_id,
+        "lat": round(lat, 6),
+        "lon": round(lon, 6),
+        "ph": round(ph, 2),
+        "turbidity": round(turbidity, 2),
+        "temperature": round(temperature, 2),
+        "flow": round(flow, 2),
+        "battery": round(battery, 2),
+        "nonce": uuid.uuid4().hex,
+    }
+    return sign_payload(payload)
+
+
+def _connect_client(device: Device) -> mqtt.Client:
+    from hydroficient.pipeline.mqtt_client import build_client, install_reconnect_policy, install_session_cache
+
+    cert_path, key_path = device.cert_files()
+    client = build_client(device.device_id, cert_path, key_path)
+    install_session_cache(client)
+    install_reconnect_policy(client)
+    client.connect_async(MQTT["host"], MQTT["port"], keepalive=60)
+    client.loop_start()
+    return client
+
+
+def run_replay(args: argparse.Namespace) -> None:
+    entries = merge_traces(args.replay)
+    options = {
+        "speed": args.speed,
+        "rewrite_ts": not args.keep_ts,
+        "rewrite_nonce": not args.keep_nonce,
+        "limit": args.limit,
+    }
+    start = time.perf_counter()
+    if args.in_process:
+        from hydroficient.pipeline.ingest_service import IngestService
+        from hydroficient.pipeline.storage import init_db
+
+        init_db()
+        service = IngestService()
+        sent = replay_trace(entries, lambda payload: service.process(json.dumps(payload).encode("utf-8")), **options)
+    else:
+        client = _connect_client(registry.get(args.device))
+        try:
+            sent = replay_trace(
+                entries,
+                lambda payload: client.publish(MQTT["topic"], json.dumps(payload), qos=1),
+                **options,
+            )
+        finally:
+            client.loop_stop()
+            client.disconnect()
+    elapsed = time.perf_counter() - start
+    rate = sent / elapsed if elapsed > 0 else 0.0
+    print(f"[simulator] replayed {sent} messages in {elapsed:.2f}s ({rate:.0f} msg/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulated water sensor device")
+    parser.add_argument("--device", default="device_001", help="registered device to publish as")
+    parser.add_argument("--fleet", type=int, help="publish for this many enabled registry devices, 0 for all")
+    parser.add_argument("--interval", type=float, default=2.0)
+    parser.add_argument("--anomaly-rate", type=float, default=0.08)
+    parser.add_argument("--record", help="write published payloads to a trace file (.jsonl or .jsonl.gz)")
+    parser.add_argument("--replay", nargs="+", help="re-publish one or more trace files instead of generating data")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier, 0 for as fast as possible")
+    parser.add_argument("--keep-ts", action="store_true", help="replay original timestamps instead of rewriting them")
+    parser.add_argument("--keep-nonce", action="store_true", help="replay original nonces instead of rewriting them")
+    parser.add_argument("--limit", type=int, help="stop replay after this many messages")
+    parser.add_argument("--in-process", action="store_true", help="feed replayed payloads straight into IngestService")
+    args = parser.parse_args()
+
+    if args.fleet is not None:
+        devices = registry.enabled_devices(with_certs=True)
+        devices = devices[: args.fleet] if args.fleet > 0 else devices
+        if not devices:
+            parser.error("no enabled registry devices with certificates")
+    else:
+        device = registry.get(args.device)
+        if device is None or device.cert_files() is None:
+            parser.error(f"{args.device} is not a registered device with a certificate")
+        devices = [device]
+
+    if args.replay:
+        run_replay(args)
+        return
+
+    clients = {}
+    for device in devices:
+        if device.cert_path not in clients:
+            clients[device.cert_path] = _connect_client(device)
+    recorder = TraceRecorder(args.record) if args.record else None
+
+    print(f"[simulator] publishing as {len(devices)} devices over {len(clients)} connections")
+    try:
+        while True:
+            started = time.perf_counter()
+            for device in devices:
+                payload = generate_payload(device.device_id, args.anomaly_rate)
+                clients[device.cert_path].publish(MQTT["topic"], json.dumps(payload), qos=1)
+                if recorder:
+                    recorder.record(payload)
+            time.sleep(max(0.0, args.interval - (time.perf_counter() - started)))
+    except KeyboardInterrupt:
+        print("[simulator] stopped")
+    finally:
+        if recorder:
+            recorder.close()
+            print(f"[simulator] recorded {recorder.count} messages to {recorder.path}")
+        for client in clients.values():
+            client.loop_stop()
+            client.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import ssl
+import statistics
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import paho.mqtt.client as mqtt
+
+from hydroficient.pipeline.config import CERTS_DIR, MQTT
+from hydroficient.pipeline.mqtt_client import build_client, install_reconnect_policy, install_session_cache
+from hydroficient.pipeline.registry import Device, DeviceRegistry
+
+
+def _cpu_seconds(pid: int) -> Optional[float]:
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class StormClient:
+    def __init__(self, index: int, device: Device, resume: bool, jitter: bool) -> None:
+        cert_path, key_path = device.cert_files()
+        client_id = f"{device.device_id}-storm-{index:04d}"
+        if resume:
+            self.client = build_client(client_id, cert_path, key_path)
+        else:
+            self.client = mqtt.Client(client_id=client_id, protocol=mqtt.MQTTv311)
+            self.client.tls_set(ca_certs=str(CERTS_DIR / "ca.crt"), certfile=str(cert_path), keyfile=str(key_path))
+        self.connected = threading.Event()
+        self.resumed = False
+        self.reconnected_at: Optional[float] = None
+        self.client.on_connect = self.on_connect
+        if resume:
+            install_session_cache(self.client)
+        if jitter:
+            install_reconnect_policy(self.client)
+        else:
+            self.client.reconnect_delay_set(min_delay=1, max_delay=120)
+
+    def on_connect(self, client: mqtt.Client, userdata, flags, rc) -> None:
+        if rc != 0:
+            return
+        sock = client.socket()
+        self.resumed = isinstance(sock, ssl.SSLSocket) and sock.session_reused
+        self.reconnected_at = time.perf_counter()
+        self.connected.set()
+
+    def start(self) -> None:
+        self.client.connect_async(MQTT["host"], MQTT["port"], keepalive=60)
+        self.client.loop_start()
+
+    def kill_connection(self) -> None:
+        self.connected.clear()
+        self.reconnected_at = None
+        sock = self.client.socket()
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def stop(self) -> None:
+        self.client.loop_stop()
+        self.client.disconnect()
+
+
+def _wait_all(clients: List[StormClient], timeout: float, broker_pid: Optional[int]) -> float:
+    deadline = time.perf_counter() + timeout
+    peak_cpu = 0.0
+    last_cpu = _cpu_seconds(broker_pid) if broker_pid else None
+    last_sample = time.perf_counter()
+    while time.perf_counter() < deadline and not all(c.connected.is_set() for c in clients):
+        time.sleep(0.1)
+        if last_cpu is not None:
+            now = time.perf_counter()
+            cpu = _cpu_seconds(broker_pid)
+            if cpu is not None:
+                peak_cpu = max(peak_cpu, (cpu - last_cpu) / (now - last_sample) * 100.0)
+                last_cpu, last_sample = cpu, now
+    return peak_cpu
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drop N device connections at once and measure recovery")
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--broker-pid", type=int, help="local broker pid to sample CPU from /proc")
+    parser.add_argument("--no-resume", action="store_true", help="use a fresh TLS context per client (full handshakes)")
+    parser.add_argument("--no-jitter", action="store_true", help="use paho's fixed exponential reconnect delay")
+    args = parser.parse_args()
+
+    devices = DeviceRegistry().enabled_devices(with_certs=True)
+    if not devices:
+        parser.error("no enabled registry devices with certificates")
+    clients = [
+        StormClient(i, devices[i % len(devices)], not args.no_resume, not args.no_jitter)
+        for i in range(args.devices)
+    ]
+    for storm_client in clients:
+        storm_client.start()
+    try:
+        _wait_all(clients, args.timeout, None)
+        ready = sum(1 for c in clients if c.connected.is_set())
+        print(f"[storm] {ready}/{len(clients)} clients connected, dropping all connections")
+        if ready < len(clients):
+            return
+
+        cpu_before = _cpu_seconds(args.broker_pid) if args.broker_pid else None
+        start = time.perf_counter()
+        for storm_client in clients:
+            storm_client.kill_connection()
+        peak_cpu = _wait_all(clients, args.timeout, args.broker_pid)
+        elapsed = time.perf_counter() - start
+
+        recovered = [c for c in clients if c.reconnected_at is not None]
+        delays = sorted(c.reconnected_at - start for c in recovered)
+        print(f"[storm] recovered {len(recovered)}/{len(clients)} in {elapsed:.2f}s")
+        if len(delays) >= 2:
+            cuts = statistics.quantiles(delays, n=100, method="inclusive")
+            print(f"[storm] reconnect p50={cuts[49]:.2f}s p95={cuts[94]:.2f}s max={delays[-1]:.2f}s")
+        resumed = sum(1 for c in recovered if c.resumed)
+        print(f"[storm] resumed sessions {resumed}/{len(recovered)}")
+        if cpu_before is not None:
+            cpu_after = _cpu_seconds(args.broker_pid) or cpu_before
+            print(f"[storm] broker cpu {cpu_after - cpu_before:.2f}s total, peak {peak_cpu:.0f}%")
+        if not args.no_resume and recovered and not resumed:
+            # Otherwise a jitter comparison would silently be measuring full handshakes.
+            raise SystemExit("[storm] no reconnect resumed its TLS session; the results are not comparable")
+    finally:
+        for storm_client in clients:
+            storm_client.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,11 @@
 from __future__ import annotations
 
+import argparse
 import random
-import sys
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 
-SRC_DIR = Path(__file__).resolve().parents[1]
-if str(SRC_DIR) not in sys.path:
-    sys.path.append(str(SRC_DIR))
-
-from pipeline.storage import insert_security_event, insert_telemetry, insert_tls_metric, init_db
-
-DEVICES = ["device_001", "device_002", "device_003"]
-LOCATIONS = {
-    "device_001": (36.7783, -119.4179),
-    "device_002": (34.0522, -118.2437),
-    "device_003": (37.7749, -122.4194),
-}
+from hydroficient.pipeline.registry import DeviceRegistry
+from hydroficient.pipeline.storage import insert_security_event, insert_telemetry, insert_tls_metric, init_db
 
 
 def _iso(dt: datetime) -> str:
@@ -25,11 +14,13 @@ def _iso(dt: datetime) -> str:
 
 def seed() -> None:
     init_db()
+    homes = {device.device_id: device.home for device in DeviceRegistry().enabled_devices()}
+    devices = sorted(homes)
     now = datetime.now(timezone.utc)
     for i in range(240):
         dt = now - timedelta(minutes=240 - i)
-        for device in DEVICES:
-            lat, lon = LOCATIONS[device]
+        for device in devices:
+            lat, lon = homes[device]
             ph = random.uniform(6.8, 8.2)
             turbidity = random.uniform(1.0, 40.0)
             temperature = random.uniform(12.0, 26.0)
@@ -70,7 +61,7 @@ def seed() -> None:
                     "stale_message",
                     "invalid_payload",
                 ]),
-                "device_id": random.choice(DEVICES),
+                "device_id": random.choice(devices),
                 "severity": random.choice(["low", "medium", "high", "critical"]),
                 "detail": {"note": "mock event"},
             }
@@ -88,6 +79,11 @@ def seed() -> None:
         )
 
 
-if __name__ == "__main__":
+def main() -> None:
+    argparse.ArgumentParser(description="Fill the database with four hours of mock telemetry and events").parse_args()
     seed()
     print("[seed] mock data generated")
+
+
+if __name__ == "__main__":
+    main()
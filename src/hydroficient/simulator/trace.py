@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import gzip
+import heapq
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from hydroficient.pipeline.auth import sign_payload
+
+TRACE_VERSION = 1
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _open(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class TraceRecorder:
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = _open(self.path, "w")
+        self._start = time.monotonic()
+        self.count = 0
+        self._fh.write(json.dumps({"version": TRACE_VERSION, "started": _now_iso()}) + "\n")
+
+    def record(self, payload: Dict) -> None:
+        offset = round(time.monotonic() - self._start, 4)
+        self._fh.write(json.dumps({"t": offset, "p": payload}, separators=(",", ":")) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "TraceRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_trace(path: Union[str, Path]) -> Iterator[Tuple[float, Dict]]:
+    with _open(Path(path), "r") as fh:
+        header = json.loads(fh.readline() or "{}")
+        if header.get("version") != TRACE_VERSION:
+            raise ValueError(f"unsupported trace version in {path}: {header.get('version')}")
+        for line in fh:
+            if line.strip():
+                entry = json.loads(line)
+                yield float(entry["t"]), entry["p"]
+
+
+def merge_traces(paths: Iterable[Union[str, Path]]) -> Iterator[Tuple[float, Dict]]:
+    return heapq.merge(*(read_trace(p) for p in paths), key=lambda entry: entry[0])
+
+
+def replay_trace(
+    entries: Iterable[Tuple[float, Dict]],
+    publish: Callable[[Dict], None],
+    speed: float = 1.0,
+    rewrite_ts: bool = True,
+    rewrite_nonce: bool = True,
+    limit: Optional[int] = None,
+) -> int:
+    start = time.monotonic()
+    sent = 0
+    for offset, payload in entries:
+        if limit is not None and sent >= limit:
+            break
+        if speed > 0:
+            delay = offset / speed - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+        payload = dict(payload)
+        if rewrite_ts:
+            payload["ts"] = _now_iso()
+        if rewrite_nonce:
+            payload["nonce"] = uuid.uuid4().hex
+        if rewrite_ts or rewrite_nonce:
+            sign_payload(payload)
+        publish(payload)
+        sent += 1
+    return sent
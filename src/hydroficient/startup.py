@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+HEAVY_MODULES = ("paho", "numpy", "pandas", "plotly", "streamlit")
+
+# Command -> (heavy top-level packages it may pull in for --help, import budget in ms).
+PROBES: Dict[str, Tuple[Tuple[str, ...], float]] = {
+    "": ((), 15.0),
+    "simulate": ((), 40.0),
+    "seed": ((), 40.0),
+    "devices": ((), 40.0),
+    "counters": ((), 40.0),
+    "export": ((), 40.0),
+    "tls-benchmark": ((), 40.0),
+    "hmac-benchmark": ((), 40.0),
+    "query-benchmark": ((), 40.0),
+    "ingest": (("paho",), 100.0),
+    "replay-attack": (("paho",), 100.0),
+    "attack-harness": (("paho",), 100.0),
+}
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    src_dir = str(Path(__file__).resolve().parents[1])
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_dir, env.get("PYTHONPATH")]))
+    return env
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(cumulative), depth))
+    return rows
+
+
+def measure(args: List[str], repeats: int) -> Tuple[float, List[Tuple[str, int, int]]]:
+    best_wall = float("inf")
+    best_rows: List[Tuple[str, int, int]] = []
+    env = _env()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
+        )
+        wall = time.perf_counter() - start
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(args)} exited with {proc.returncode}: {proc.stderr[-500:]}")
+        if wall < best_wall:
+            best_wall, best_rows = wall, parse_importtime(proc.stderr)
+    return best_wall * 1000.0, best_rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure CLI start-up with -X importtime and enforce a budget")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply every per-command budget")
+    parser.add_argument("--top", type=int, default=3, help="heaviest imports to list per command")
+    parser.add_argument("commands", nargs="*", help="commands to probe (default: all known probes)")
+    args = parser.parse_args()
+
+    baseline_ms, baseline_rows = measure(["-c", "pass"], args.repeats)
+    baseline: Set[str] = {name for name, _, _ in baseline_rows}
+    print(f"[startup] bare interpreter {baseline_ms:.1f}ms ({len(baseline)} modules)")
+
+    failures = []
+    for command in args.commands or list(PROBES):
+        wall_ms, rows = measure(["-m", "hydroficient", *filter(None, [command]), "--help"], args.repeats)
+        own = [(name, cumulative) for name, cumulative, depth in rows if depth == 0 and name not in baseline]
+        import_ms = sum(cumulative for _, cumulative in own) / 1000.0
+        loaded = {name.split(".")[0] for name, _, _ in rows}
+        allowed, budget_ms = PROBES.get(command, ((), 40.0))
+        budget_ms *= args.budget_scale
+        heavy = sorted(m for m in HEAVY_MODULES if m in loaded and m not in allowed)
+        heaviest = sorted(own, key=lambda row: -row[1])[: args.top]
+        top = ", ".join(f"{name} {cumulative / 1000:.1f}ms" for name, cumulative in heaviest)
+        label = command or "(help)"
+        print(
+            f"[startup] {label:<16} wall={wall_ms:6.1f}ms (+{wall_ms - baseline_ms:5.1f}) "
+            f"imports={import_ms:6.1f}/{budget_ms:.0f}ms modules={len(rows) - len(baseline_rows):>4} top: {top}"
+        )
+        if heavy:
+            failures.append(f"{label} imports {', '.join(heavy)}")
+        if import_ms > budget_ms:
+            failures.append(f"{label} imports take {import_ms:.1f}ms > {budget_ms:.0f}ms")
+
+    for failure in failures:
+        print(f"[startup] FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print("[startup] all commands within budget and free of unexpected heavy imports")